@@ -4,6 +4,7 @@ import os
 from dotenv import load_dotenv
 import logging
 import asyncio
+import sys
 from typing import List, Optional
 
 # Setup logging
@@ -275,6 +276,14 @@ async def main():
 
 
 if __name__ == '__main__':
+    # Use libuv's event loop when available; it must be installed before the loop starts
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
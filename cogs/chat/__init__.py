@@ -6,15 +6,93 @@ Main module initialization with setup() function for Discord bot extension loadi
 Coordinates all layers: cogs, core, models, services, storage, and integrations.
 """
 
-import discord
-from discord.ext import commands
-
+import importlib
 import logging
+import logging.handlers
+import queue
+from typing import Optional
 
-from .cogs import ChatCog, MusicCog, StatsCog, AdminCog
+from discord.ext import commands
 
 logger = logging.getLogger(__name__)
 
+# Background listener that formats and writes this package's log records
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+# Public names resolved on first access (PEP 562) so importing the package,
+# or one of its subpackages, does not pull in every cog and provider SDK.
+# Only ChatCog is re-exported; the auxiliary cogs are wired up by setup() and
+# remain importable from cogs.chat.cogs.
+_LAZY = {
+    'ChatCog': '.cogs',
+}
+
+__all__ = ('setup', 'ChatCog')
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return list(globals()) + list(_LAZY)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() renders msg % args and the traceback on the calling
+        # thread so records can be pickled; this queue never leaves the process
+        return record
+
+
+def _install_queue_logging() -> None:
+    """
+    Route the package's log records through a queue.
+    
+    Chat handlers log on every message; the event loop only creates and
+    enqueues each record, and a background thread does the %-interpolation,
+    traceback rendering and file/console I/O using the root logger's handlers.
+    Arguments are formatted when the listener gets to the record, so log calls
+    should not pass objects that are mutated right afterwards.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    handlers = logging.getLogger().handlers
+    if not handlers:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_DeferredQueueHandler(log_queue))
+    logger.propagate = False
+    
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _log_listener.start()
+
+
+def _remove_queue_logging() -> None:
+    """Flush the log queue and restore normal propagation."""
+    global _log_listener
+    if _log_listener is None:
+        return
+    
+    _log_listener.stop()
+    _log_listener = None
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    logger.propagate = True
+
 
 async def setup(bot: commands.Bot) -> None:
     """
@@ -30,9 +108,13 @@ async def setup(bot: commands.Bot) -> None:
         # In bot.py
         await bot.load_extension("chat")
     """
-    
+    from .cogs import ChatCog, MusicCog, StatsCog, AdminCog
+
+    _install_queue_logging()
+
     # Initialize main ChatCog (handles all core chat functionality)
     chat_cog = ChatCog(bot)
+    await chat_cog.provider_router.warmup()
     await bot.add_cog(chat_cog)
     logger.info("✅ ChatCog loaded")
 
@@ -60,3 +142,8 @@ async def setup(bot: commands.Bot) -> None:
     logger.info("=" * 50)
     logger.info("🤖 Chat module fully initialized!")
     logger.info("=" * 50)
+
+
+async def teardown(bot: commands.Bot) -> None:
+    """Called by discord.py when the extension is unloaded."""
+    _remove_queue_logging()
@@ -31,6 +31,9 @@ class AdminCog(commands.Cog):
     @commands.is_owner()
     async def reload_config(self, ctx: commands.Context) -> None:
         self.config.reload()
+        chat_cog = self.bot.get_cog("ChatCog")
+        if chat_cog is not None:
+            chat_cog.refresh_config_caches()
         await ctx.send("✅ Chat configuration reloaded.")
 
     @chat_admin.command(name="resetuser")
@@ -9,17 +9,17 @@ Handles on_message events and chat-related slash commands.
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-from typing import Optional, List, Tuple
+from typing import Iterator, List, Optional, Tuple
 import logging
 import time
 import re
-import json
 import asyncio
-from datetime import datetime
+import orjson
 
 from ..core import ChatConfig, RateLimiter, get_personality_manager
 from ..core import ChatException, RateLimitException
-from ..models import ChannelMemory, GuildMemory
+from ..core.personality import WHOS_ONLINE_PHRASES
+from ..models import ProviderType
 from ..services import ChatService, MemoryManager, ProviderRouter, SafetyFilter
 from ..storage import MemoryStorage
 from ..integrations import MusicIntegration
@@ -27,9 +27,95 @@ from ..integrations import MusicIntegration
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj, pretty: bool = False) -> str:
+    """Encode a payload with orjson; indent only when a human reads it directly."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+
+
+def _log_payload(person: str, action: str, chat: str, song: str = "", query: str = "") -> dict:
+    """Build the IN/OUT log record (literal keys are already interned constants)."""
+    return {"person": person, "action": action, "chat": chat, "song": song, "query": query}
+
+
+# ==================== Precompiled Patterns ====================
+
+# ">> Song Name" recommendations in personality responses
+_SONG_REC_RE = re.compile(r'>>\s*(.*?)(?=\n|$)')
+# Characters stripped from song queries
+_SONG_CLEAN_RE = re.compile(r'[^\w\s\-]')
+# Direct play requests (English + Hindi): "play [song] X", "baja X", "sunao X", "suna de X"
+_PLAY_INTENT_RE = re.compile(r'(?:play(?:\s+song)?|baja|sunao|suna\s+de)\s+(.+)')
+# Inline JSON objects the model sometimes emits, and helpers for cleaning responses
+_JSON_OBJECT_RE = re.compile(r'\{[^{}]*(?:"[^"]*"[^{}]*)*\}')
+_WHITESPACE_RE = re.compile(r'\s+')
+_QUOTED_SONG_RE = re.compile(r'["\']([^"\']{3,})["\']')
+
+# English music request patterns
+_MUSIC_REQUEST_EN = tuple(re.compile(p) for p in (
+    r'play\s+(some\s+)?music',
+    r'play\s+(some\s+)?songs?',
+    r'suggest\s+(some\s+)?songs?',
+    r'recommend\s+(some\s+)?songs?',
+    r'put\s+on\s+music',
+    r'queue\s+music',
+    r'queue\s+songs?',
+    r'find\s+songs?',
+    r'search\s+songs?',
+))
+
+# Hindi music request patterns (Hinglish - Hindi written in English)
+_MUSIC_REQUEST_HI = tuple(re.compile(p) for p in (
+    r'ga[an]+e?\s+suggest',       # gane/gaana/gana suggest
+    r'ga[an]+a?\s+baja',           # gaana/gana baja (play song)
+    r'suna?[ao]?\s+de',            # suna de / sunao / sumo de
+    r'sun',                        # sunao, sun, etc
+    r'songs?\s+suggest',          # songs suggest
+    r'ga[an]+[ae]?\s+cha',        # gane/gaana want
+    r'music\s+cha',               # want music
+    r'koi\s+ga[an]+[ae]?',        # any song (koi gane/gaana)
+    r'kuch\s+ga[an]+[ae]?',       # some songs
+    r'recommendation',            # recommendation
+))
+
+# Confirmation patterns - English + Hindi
+_PLAY_CONFIRM_PATTERNS = tuple(re.compile(p) for p in (
+    # English
+    r'\byes\b', r'\bokay?\b', r'\bok\b', r'\bk\b', r'\bgo\b', r'\bdo\s+it\b',
+    r'\bstart\b', r'\bplay\b', r'\blet\'s\s+go\b',
+    # Hindi/Hinglish
+    r'\bha[an]+\b',              # han / haan
+    r'\bbaaja?\b',               # baja / baja
+    r'\bsuna?[ao]?\s+de\b',      # suna de / sunao
+    r'\bch[au]l\b',              # chaal / chul
+    r'\bthe[io]k\b',             # theek / theik
+    r'\bshadi\b',                # shudd (sure)
+    r'\bthee[ko]?',              # theek
+    r'\bsho\b',                  # sho (yes/sure)
+))
+
+# Rejection patterns - English + Hindi
+_SONG_REJECT_PATTERNS = tuple(re.compile(p) for p in (
+    # English
+    r'\bno\b', r'\bnope\b', r'\bdon\'t\b', r'\bnot\s+this\b', r'\another\b',
+    # Hindi/Hinglish
+    r'\bna[ah]+\b',               # nah / naa
+    r'\bna\b',                   # na (no)
+    r'\bye\s+wala\s+ne',         # ye wala ne (not this one)
+    r'\bkoi\s+aur\b',            # koi aur (any other)
+    r'\bkuch\s+aur\b',           # kuch aur (something else)
+    r'\bfir\s+se\b',             # fir se (again/different)
+    r'\bnahin\b',                # nahin (no)
+))
+
+
 class ChatCog(commands.Cog):
     """Advanced AI Chat Cog for Discord."""
 
+    # Seconds between edits of a streamed reply (Discord allows 5 edits / 5s)
+    STREAM_EDIT_INTERVAL = 1.0
+    # Replies faster than this (e.g. cache hits) are sent without a typing indicator
+    TYPING_DELAY = 0.4
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
@@ -39,6 +125,7 @@ class ChatCog(commands.Cog):
         )
 
         self.personality_manager = get_personality_manager(bot=self.bot)
+        self._special_prefixes = self.personality_manager.special_command_prefixes
         self.config.personality = self.personality_manager
         self.music_integration = MusicIntegration(bot=self.bot)
 
@@ -58,18 +145,107 @@ class ChatCog(commands.Cog):
             global_requests_per_minute=self.config.rate_limit.global_requests_per_minute
         )
 
+        # Static command prefixes; None means the prefix is dynamic and every
+        # message has to go through bot.get_context()
+        prefix = self.bot.command_prefix
+        if isinstance(prefix, str):
+            self._prefixes: Optional[Tuple[str, ...]] = (prefix,)
+        elif callable(prefix):
+            self._prefixes = None
+        else:
+            self._prefixes = tuple(prefix)
+
+        # Dedicated channel IDs and the help embed, rebuilt only when the config is reloaded
+        self._dedicated_channels: frozenset = frozenset()
+        self._help_embed: Optional[discord.Embed] = None
+        self.refresh_config_caches()
+
         # ===== State Management for Music Suggestions =====
         # Track: {user_id: {"song": "Song Name", "mood": "happy", "timestamp": time}}
         self.pending_song_suggestions = {}
 
+        # Bot identity strings, filled in once the bot user is known
+        self._mention_tokens: Tuple[str, ...] = ()  # "<@id>" / "<@!id>"
+        self._bot_name = ""
+        self._bot_name_lower = ""
+        self._signature = ""  # "\n\n> *— name*" appended when show_provider is on
+
+        # Fire-and-forget work kept referenced until it finishes
+        self._background_tasks: set = set()
+
         self._cleanup_task.start()
+        self._keep_warm_task.start()
+
+    def refresh_config_caches(self) -> None:
+        """Rebuild everything derived from the config (dedicated channels, help embed)."""
+        self._dedicated_channels = frozenset(self.config.get_dedicated_channels())
+        self._help_embed = self._build_help_embed()
+
+    def _build_help_embed(self) -> discord.Embed:
+        """Build the /chathelp embed (only config values vary, so it is rebuilt on reload)."""
+        embed = discord.Embed(
+            title="🤖 AI Chatbot Help",
+            description="Here's how to use the AI chatbot:",
+            color=discord.Color.blue()
+        )
+        embed.add_field(
+            name="💬 How to Chat",
+            value=(
+                "• `/ask <question>` - Ask the AI anything\n"
+                "• `/chat <message>` - Same as /ask\n"
+                "• `@mention` the bot - Chat naturally\n"
+                "• Reply to bot messages - Continue conversation\n"
+                "• Chat in dedicated channels - No tags needed"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="⚡ Features",
+            value=(
+                f"✅ Conversation memory ({self.config.max_history} messages)\n"
+                f"✅ Multiple AI providers with fallback\n"
+                f"✅ Selectable personalities\n"
+                f"✅ Rate limiting ({self.config.rate_limit.user_cooldown}s cooldown)\n"
+                f"✅ DM support: {'Enabled' if self.config.features.allow_dm else 'Disabled'}"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="🎭 Personality Commands",
+            value=(
+                "• `/setpersonality` - Show available personalities\n"
+                "• `/setpersonality <name>` - Set channel personality"
+            ),
+            inline=False
+        )
+        embed.set_footer(text="Need more help? Use /chatping to check bot status")
+        return embed
+
+    async def cog_load(self) -> None:
+        # Index stored memories in a worker thread before any message is handled
+        await self.storage.initialize()
 
-    def cog_unload(self) -> None:
+    async def cog_unload(self) -> None:
         self._cleanup_task.cancel()
+        self._keep_warm_task.cancel()
+        await self.memory_manager.close()
+        await self.provider_router.close()
         logger.info("ChatCog unloaded")
 
     # ==================== Background Tasks ====================
 
+    def _spawn_background(self, coro, description: str) -> None:
+        """Run a side-effect coroutine off the response path, logging any failure."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+
+        def _on_done(done: asyncio.Task) -> None:
+            self._background_tasks.discard(done)
+            if not done.cancelled() and done.exception() is not None:
+                logger.error(f"Background {description} failed: {done.exception()}")
+
+        task.add_done_callback(_on_done)
+
     @tasks.loop(hours=1)
     async def _cleanup_task(self) -> None:
         try:
@@ -79,9 +255,29 @@ class ChatCog(commands.Cog):
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
 
+    @tasks.loop(minutes=1)
+    async def _keep_warm_task(self) -> None:
+        try:
+            await self.provider_router.keep_warm()
+        except Exception as e:
+            logger.debug(f"Keep-warm ping failed: {e}")
+
+    @_keep_warm_task.before_loop
+    async def _before_keep_warm(self) -> None:
+        await self.bot.wait_until_ready()
+
     @_cleanup_task.before_loop
     async def _before_cleanup(self) -> None:
         await self.bot.wait_until_ready()
+        self._cache_bot_identity()
+
+    def _cache_bot_identity(self) -> None:
+        """Cache the bot's mention strings and name used on every message."""
+        user = self.bot.user
+        self._mention_tokens = (f"<@{user.id}>", f"<@!{user.id}>")
+        self._bot_name = user.name
+        self._bot_name_lower = user.name.lower()
+        self._signature = f"\n\n> *— {self._bot_name_lower}*"
 
     # ==================== Core Processing ====================
 
@@ -92,17 +288,17 @@ class ChatCog(commands.Cog):
         channel_id: int = None,
         guild_id: int = None,
     ) -> Tuple[str, Optional[str]]:
-        """Process a chat request through the service layer."""
+        """Process a chat request through the service layer (rate limit already charged)."""
         try:
-            await self.rate_limiter.acquire(user_id)
-            response, provider = await self.chat_service.process_message(
-                user_id=user_id,
-                channel_id=channel_id,
-                message=message,
-                guild_id=guild_id,
-                use_channel_memory=True,
-                use_guild_memory=True,
-            )
+            async with self.rate_limiter.guard(user_id):
+                response, provider = await self.chat_service.process_message(
+                    user_id=user_id,
+                    channel_id=channel_id,
+                    message=message,
+                    guild_id=guild_id,
+                    use_channel_memory=True,
+                    use_guild_memory=True,
+                )
             return response, provider
         except ValueError as e:
             raise ChatException(str(e))
@@ -112,6 +308,80 @@ class ChatCog(commands.Cog):
             logger.error(f"Chat service error: {e}")
             raise ChatException("Failed to process request")
 
+    async def _await_with_typing(self, channel, coro):
+        """Await ``coro``, showing a typing indicator only if it outlasts TYPING_DELAY."""
+        task = asyncio.create_task(coro)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=self.TYPING_DELAY)
+        except asyncio.TimeoutError:
+            async with channel.typing():
+                return await task
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+    async def _stream_chat_response(
+        self,
+        message: discord.Message,
+        content: str,
+        enhanced_message: str,
+    ) -> None:
+        """Stream the AI response into a reply that is edited as text arrives."""
+        response, reply = await self._stream_into(
+            lambda preview: message.reply(preview, mention_author=False),
+            message.author.id,
+            enhanced_message,
+            message.channel.id,
+            message.guild.id if message.guild else None,
+        )
+        await self._send_response(message, content, response, ProviderType.GROQ, reply_to_edit=reply)
+
+    async def _stream_into(
+        self,
+        send_first,
+        user_id: int,
+        message: str,
+        channel_id: int,
+        guild_id: Optional[int],
+    ) -> Tuple[str, Optional[discord.Message]]:
+        """Stream a chat response, posting it with ``send_first`` and editing it as text arrives.
+
+        The first text is posted as soon as it arrives; later edits are
+        throttled to one per STREAM_EDIT_INTERVAL. Returns the full redacted
+        response and the preview message (None if the stream produced no text).
+        """
+        parts = []
+        preview_message = None
+        last_edit = 0.0
+        try:
+            async with self.rate_limiter.guard(user_id):
+                async for delta in self.chat_service.stream_message(
+                    user_id=user_id,
+                    channel_id=channel_id,
+                    message=message,
+                    guild_id=guild_id,
+                    use_channel_memory=True,
+                    use_guild_memory=True,
+                ):
+                    parts.append(delta)
+                    if time.monotonic() - last_edit < self.STREAM_EDIT_INTERVAL:
+                        continue
+                    preview = self.safety_filter.redact_secrets("".join(parts))[:2000]
+                    if preview_message is None:
+                        preview_message = await send_first(preview)
+                    else:
+                        await preview_message.edit(content=preview)
+                    last_edit = time.monotonic()
+        except RateLimitException:
+            raise
+        except ValueError as e:
+            raise ChatException(str(e))
+        except Exception as e:
+            logger.error(f"Chat service error: {e}")
+            raise ChatException("Failed to process request")
+
+        return self.safety_filter.redact_secrets("".join(parts)), preview_message
+
     # ==================== Helper: Detect Music Request ====================
 
     def _detect_music_request(self, message: str) -> bool:
@@ -121,45 +391,16 @@ class ChatCog(commands.Cog):
         """
         message_lower = message.lower()
         
-        # English music request patterns
-        english_triggers = [
-            r'play\s+(some\s+)?music',
-            r'play\s+(some\s+)?songs?',
-            r'suggest\s+(some\s+)?songs?',
-            r'recommend\s+(some\s+)?songs?',
-            r'put\s+on\s+music',
-            r'queue\s+music',
-            r'queue\s+songs?',
-            r'find\s+songs?',
-            r'search\s+songs?',
-        ]
-        
-        # Hindi music request patterns (Hinglish - Hindi written in English)
-        hindi_triggers = [
-            r'ga[an]+e?\s+suggest',       # gane/gaana/gana suggest
-            r'ga[an]+a?\s+baja',           # gaana/gana baja (play song)
-            r'suna?[ao]?\s+de',            # suna de / sunao / sumo de
-            r'sun',                        # sunao, sun, etc
-            r'songs?\s+suggest',          # songs suggest
-            r'ga[an]+[ae]?\s+cha',        # gane/gaana want
-            r'music\s+cha',               # want music
-            r'koi\s+ga[an]+[ae]?',        # any song (koi gane/gaana)
-            r'kuch\s+ga[an]+[ae]?',       # some songs
-            r'recommendation',            # recommendation
-        ]
-        
-        import re
-        
         # Check English patterns
-        for pattern in english_triggers:
-            if re.search(pattern, message_lower):
-                logger.info(f"🎵 Music request (English) detected: {pattern}")
+        for pattern in _MUSIC_REQUEST_EN:
+            if pattern.search(message_lower):
+                logger.info("🎵 Music request (English) detected: %s", pattern.pattern)
                 return True
         
         # Check Hindi patterns
-        for pattern in hindi_triggers:
-            if re.search(pattern, message_lower):
-                logger.info(f"🎵 Music request (Hindi) detected: {pattern}")
+        for pattern in _MUSIC_REQUEST_HI:
+            if pattern.search(message_lower):
+                logger.info("🎵 Music request (Hindi) detected: %s", pattern.pattern)
                 return True
         
         return False
@@ -172,27 +413,9 @@ class ChatCog(commands.Cog):
         Triggers on: yes, ok, suna le, han baja, etc.
         """
         message_lower = message.lower()
-        
-        # Confirmation patterns - English + Hindi
-        confirm_patterns = [
-            # English
-            r'\byes\b', r'\bokay?\b', r'\bok\b', r'\bk\b', r'\bgo\b', r'\bdo\s+it\b',
-            r'\bstart\b', r'\bplay\b', r'\blet\'s\s+go\b',
-            # Hindi/Hinglish
-            r'\bha[an]+\b',              # han / haan
-            r'\bbaaja?\b',               # baja / baja
-            r'\bsuna?[ao]?\s+de\b',      # suna de / sunao
-            r'\bch[au]l\b',              # chaal / chul
-            r'\bthe[io]k\b',             # theek / theik
-            r'\bshadi\b',                # shudd (sure)
-            r'\bthee[ko]?',              # theek
-            r'\bsho\b',                  # sho (yes/sure)
-        ]
-        
-        import re
-        for pattern in confirm_patterns:
-            if re.search(pattern, message_lower):
-                logger.info(f"🎵 Play confirmation detected: {pattern}")
+        for pattern in _PLAY_CONFIRM_PATTERNS:
+            if pattern.search(message_lower):
+                logger.info("🎵 Play confirmation detected: %s", pattern.pattern)
                 return True
         return False
 
@@ -204,25 +427,9 @@ class ChatCog(commands.Cog):
         Triggers on: no, ye wala ne, koi aur, etc.
         """
         message_lower = message.lower()
-        
-        # Rejection patterns - English + Hindi
-        reject_patterns = [
-            # English
-            r'\bno\b', r'\bnope\b', r'\bdon\'t\b', r'\bnot\s+this\b', r'\another\b',
-            # Hindi/Hinglish
-            r'\bna[ah]+\b',               # nah / naa
-            r'\bna\b',                   # na (no)
-            r'\bye\s+wala\s+ne',         # ye wala ne (not this one)
-            r'\bkoi\s+aur\b',            # koi aur (any other)
-            r'\bkuch\s+aur\b',           # kuch aur (something else)
-            r'\bfir\s+se\b',             # fir se (again/different)
-            r'\bnahin\b',                # nahin (no)
-        ]
-        
-        import re
-        for pattern in reject_patterns:
-            if re.search(pattern, message_lower):
-                logger.info(f"🎵 Song rejection detected: {pattern}")
+        for pattern in _SONG_REJECT_PATTERNS:
+            if pattern.search(message_lower):
+                logger.info("🎵 Song rejection detected: %s", pattern.pattern)
                 return True
         return False
 
@@ -231,53 +438,18 @@ class ChatCog(commands.Cog):
         message: discord.Message,
         content: str,
         response: str,
-        provider: Optional[str]
+        provider: Optional[str],
+        reply_to_edit: Optional[discord.Message] = None
     ) -> None:
-        """Format and send the AI response to Discord."""
-        # Step 1: Extract and remove JSON objects from response
-        parsed_response = response
-        extracted_songs = []
-        
-        # Remove ALL JSON objects from the response and extract songs
-        json_pattern = r'\{[^{}]*(?:"[^"]*"[^{}]*)*\}'
-        json_matches = re.finditer(json_pattern, parsed_response)
-        
-        for match in json_matches:
-            try:
-                json_text = match.group()
-                json_data = json.loads(json_text)
-                
-                if isinstance(json_data, dict):
-                    # Extract songs from JSON
-                    if 'song' in json_data:
-                        song = json_data['song']
-                        if isinstance(song, str):
-                            extracted_songs.append(song.strip())
-                    
-                    if 'songs' in json_data and isinstance(json_data['songs'], list):
-                        extracted_songs.extend([s for s in json_data['songs'] if isinstance(s, str)])
-                    
-                    if 'query' in json_data:
-                        query = json_data['query']
-                        if isinstance(query, str) and query.startswith('>>'):
-                            song_name = query[2:].strip()
-                            if song_name and song_name not in extracted_songs:
-                                extracted_songs.append(song_name)
-                    
-                    if 'play_all' in json_data:
-                        play_query = json_data['play_all']
-                        if isinstance(play_query, str) and play_query.startswith('>>'):
-                            song_name = play_query[2:].strip()
-                            if song_name and song_name not in extracted_songs:
-                                extracted_songs.append(song_name)
-            except json.JSONDecodeError:
-                # Skip invalid JSON
-                pass
-        
-        # Remove all JSON objects from the display text
-        parsed_response = re.sub(json_pattern, '', response)
+        """Format and send the AI response to Discord.
+
+        If ``reply_to_edit`` is given (a streamed preview), its content is
+        replaced with the final text instead of sending a new reply.
+        """
+        # Step 1: Strip inline JSON objects (song metadata) from the display text
+        parsed_response = _JSON_OBJECT_RE.sub('', response)
         # Clean up extra spaces and newlines
-        parsed_response = re.sub(r'\s+', ' ', parsed_response).strip()
+        parsed_response = _WHITESPACE_RE.sub(' ', parsed_response).strip()
         
         # If response is empty after JSON removal, use original
         if not parsed_response or len(parsed_response) < 5:
@@ -285,44 +457,64 @@ class ChatCog(commands.Cog):
         
         # Format response text
         if self.config.features.show_provider and provider:
-            bot_name = self.bot.user.name.lower()
-            response_text = f"{parsed_response}\n\n> *— {bot_name}*"
+            if not self._signature:
+                self._cache_bot_identity()
+            response_text = parsed_response + self._signature
         else:
             response_text = parsed_response
 
         # Step 2: Extract quoted song names from AI response for later confirmation
-        quoted_songs = re.findall(r'["\']([^"\']{3,})["\']', response)
+        quoted_songs = self._limit_songs(_QUOTED_SONG_RE.findall(response))
         if quoted_songs:
             self.pending_song_suggestions[message.author.id] = {
                 "songs": quoted_songs,
                 "timestamp": time.time()
             }
-            logger.info(f"🎵 Stored suggested songs from AI response: {quoted_songs}")
-
-        # Step 3: Check for additional song recommendations in regular text
-        if not extracted_songs:
-            raw_songs = self.music_integration.extract_songs_from_text(response_text)
-            for song in raw_songs:
-                clean_song = re.sub(r'[^\w\s\-]', '', song).strip()
-                if clean_song:
-                    extracted_songs.append(clean_song)
-        
-        # Step 4: Log and send response (NO auto-play - music only on explicit user request)
-        json_log = {
-            "person": message.author.name,
-            "action": "chat",
-            "chat": response_text[:500] if len(response_text) > 500 else response_text,
-            "song": "",
-            "query": ""
-        }
-        logger.info(f"📥 IN: {content}")
-        logger.info(f"📤 OUT: {json.dumps(json_log, indent=2)}")
-
-        if len(response_text) > 2000:
-            for chunk in self._split_message(response_text, 2000):
-                await message.reply(chunk, mention_author=False)
-        else:
-            await message.reply(response_text, mention_author=False)
+            logger.info("🎵 Stored suggested songs from AI response: %s", quoted_songs)
+
+        # Step 3: Log and send response (NO auto-play - music only on explicit user request)
+        if logger.isEnabledFor(logging.INFO):
+            encoded = _dumps(_log_payload(
+                message.author.name,
+                "chat",
+                response_text[:500]
+            ))
+            logger.info("📥 IN: %s", content)
+            logger.info("📤 OUT: %s", encoded)
+
+        chunks = self._iter_chunks(response_text)
+        if reply_to_edit is not None:
+            await reply_to_edit.edit(content=next(chunks, response_text))
+        for chunk in chunks:
+            await message.reply(chunk, mention_author=False)
+
+    def _limit_songs(self, songs) -> List[str]:
+        """Drop duplicate songs (keeping order) and cap them at max_songs_per_message."""
+        return list(dict.fromkeys(songs))[:self.config.features.max_songs_per_message or 5]
+
+    async def _dispatch_response_with_songs(self, message: discord.Message, response_text: str) -> None:
+        """Reply with a canned response and queue any ">> Song" recommendations in it."""
+        song_recommendations = self._limit_songs(
+            song for song in (
+                _SONG_CLEAN_RE.sub('', s).strip()
+                for s in _SONG_REC_RE.findall(response_text)
+            )
+            if song
+        )
+
+        reply = message.reply
+        for chunk in self._iter_chunks(response_text):
+            await reply(chunk, mention_author=False)
+
+        if song_recommendations:
+            ctx = await self.bot.get_context(message)
+            results = await self.music_integration.search_and_play_many(
+                ctx, song_recommendations
+            )
+            # One reply for all songs (chunked only if it overflows), per-song errors included
+            combined = "\n".join(play_response for _, play_response in results)
+            for chunk in self._iter_chunks(combined):
+                await reply(chunk, mention_author=False)
 
     # ==================== Commands ====================
 
@@ -333,23 +525,38 @@ class ChatCog(commands.Cog):
             await ctx.send("❌ Chat commands are not allowed in DMs.")
             return
 
+        retry_after = self.rate_limiter.try_acquire_nowait(ctx.author.id)
+        if retry_after is not None:
+            await ctx.send(f"⏳ You're sending messages too fast! Please wait {retry_after:.1f} seconds.")
+            return
+
         await ctx.defer()
 
         try:
-            response, provider = await self._process_chat_request(
-                ctx.author.id, question, ctx.channel.id,
-                ctx.guild.id if ctx.guild else None
-            )
+            preview_message = None
+            guild_id = ctx.guild.id if ctx.guild else None
+            if self.config.features.stream_responses:
+                response, preview_message = await self._stream_into(
+                    ctx.send, ctx.author.id, question, ctx.channel.id, guild_id
+                )
+                provider = ProviderType.GROQ
+            else:
+                response, provider = await self._process_chat_request(
+                    ctx.author.id, question, ctx.channel.id, guild_id
+                )
             if self.config.features.show_provider and provider:
-                response_text = f"{response}\n\n> *— {self.bot.user.name.lower()}*"
+                if not self._signature:
+                    self._cache_bot_identity()
+                response_text = response + self._signature
             else:
                 response_text = response
 
-            if len(response_text) > 2000:
-                for chunk in self._split_message(response_text, 2000):
-                    await ctx.send(chunk)
-            else:
-                await ctx.send(response_text)
+            chunks = self._iter_chunks(response_text)
+            if preview_message is not None:
+                # Replace the streamed preview with the final first chunk
+                await preview_message.edit(content=next(chunks, response_text[:2000]))
+            for chunk in chunks:
+                await ctx.send(chunk)
 
         except RateLimitException as e:
             await ctx.send(f"⏳ You're sending messages too fast! Please wait {e.retry_after:.1f} seconds.")
@@ -440,58 +647,22 @@ class ChatCog(commands.Cog):
 
     @commands.hybrid_command(name="chatping", description="Check if the chatbot is responsive")
     async def ping(self, ctx: commands.Context) -> None:
-        start_time = time.time()
-        latency = (time.time() - start_time) * 1000
+        # Gateway heartbeat latency; the old start/stop timer measured nothing
+        latency = self.bot.latency * 1000
         embed = discord.Embed(
             title="🟢 Chatbot Status",
             color=discord.Color.green(),
-            timestamp=datetime.utcnow()
+            timestamp=discord.utils.utcnow()
         )
         embed.add_field(name="Response Time", value=f"`{latency:.2f}ms`", inline=True)
         embed.add_field(name="Status", value="✅ **Online**", inline=True)
         embed.add_field(name="Provider", value="✅ `Groq`", inline=False)
         embed.set_footer(text="Use /chathelp for more info")
-        await ctx.send(embed=embed)
+        await ctx.send(embed=embed, silent=True)
 
     @commands.hybrid_command(name="chathelp", description="Show chatbot help and available commands")
     async def chat_help(self, ctx: commands.Context) -> None:
-        embed = discord.Embed(
-            title="🤖 AI Chatbot Help",
-            description="Here's how to use the AI chatbot:",
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="💬 How to Chat",
-            value=(
-                "• `/ask <question>` - Ask the AI anything\n"
-                "• `/chat <message>` - Same as /ask\n"
-                "• `@mention` the bot - Chat naturally\n"
-                "• Reply to bot messages - Continue conversation\n"
-                "• Chat in dedicated channels - No tags needed"
-            ),
-            inline=False
-        )
-        embed.add_field(
-            name="⚡ Features",
-            value=(
-                f"✅ Conversation memory ({self.config.max_history} messages)\n"
-                f"✅ Multiple AI providers with fallback\n"
-                f"✅ Selectable personalities\n"
-                f"✅ Rate limiting ({self.config.rate_limit.user_cooldown}s cooldown)\n"
-                f"✅ DM support: {'Enabled' if self.config.features.allow_dm else 'Disabled'}"
-            ),
-            inline=False
-        )
-        embed.add_field(
-            name="🎭 Personality Commands",
-            value=(
-                "• `/setpersonality` - Show available personalities\n"
-                "• `/setpersonality <name>` - Set channel personality"
-            ),
-            inline=False
-        )
-        embed.set_footer(text="Need more help? Use /chatping to check bot status")
-        await ctx.send(embed=embed)
+        await ctx.send(embed=self._help_embed, silent=True)
 
     # ==================== SINGLE on_message (dedicated + mention + reply) ====================
 
@@ -501,18 +672,19 @@ class ChatCog(commands.Cog):
         if message.author.bot:
             return
 
-        # Let command handler deal with commands
-        ctx = await self.bot.get_context(message)
-        if ctx.valid:
-            return
+        # Let command handler deal with commands (only parse messages that can be one)
+        if self._prefixes is None or message.content.startswith(self._prefixes):
+            ctx = await self.bot.get_context(message)
+            if ctx.valid:
+                return
 
-        dedicated_channels = self.config.get_dedicated_channels()
-        is_dedicated_channel = message.channel.id in dedicated_channels
-        bot_mentioned = self.bot.user in message.mentions
+        bot_user = self.bot.user
+        is_dedicated_channel = message.channel.id in self._dedicated_channels
+        bot_mentioned = bot_user in message.mentions
         is_reply_to_bot = (
             message.reference and
             message.reference.resolved and
-            message.reference.resolved.author.id == self.bot.user.id
+            message.reference.resolved.author.id == bot_user.id
         )
 
         if not (is_dedicated_channel or bot_mentioned or is_reply_to_bot):
@@ -523,124 +695,126 @@ class ChatCog(commands.Cog):
 
         content = message.content
         if bot_mentioned:
-            content = content.replace(f"<@{self.bot.user.id}>", "").strip()
-            content = content.replace(f"<@!{self.bot.user.id}>", "").strip()
+            if not self._mention_tokens:
+                self._cache_bot_identity()
+            for token in self._mention_tokens:
+                content = content.replace(token, "")
+            content = content.strip()
 
         if not content:
             return
 
-        # --- Special personality commands ---
-        special_response = self.personality_manager.handle_special_command(
-            user_id=message.author.id,
-            message=content,
-            user_name=message.author.name,
-            channel=message.channel
-        )
+        await self._handle_incoming(message, content)
+
+    async def _handle_incoming(self, message: discord.Message, content: str) -> None:
+        """Handle a chat message addressed to the bot (mention already stripped)."""
+        author = message.author
+        personality = self.personality_manager
+        music = self.music_integration
 
-        # Who's online check
+        # Who's online check (needs channel context, so it is handled here)
         msg_lower = content.lower().strip()
-        if msg_lower in ["who's online", "who is online", "online users", "active users"]:
-            members = await self.personality_manager.get_online_users(message.channel)
-            response_text = self.personality_manager.format_whos_online_response(members, message.channel.name)
+        if msg_lower in WHOS_ONLINE_PHRASES:
+            members = await personality.get_online_users(message.channel)
+            response_text = personality.format_whos_online_response(members, message.channel.name)
             await message.reply(response_text, mention_author=False)
             return
 
+        # --- Special personality commands ---
+        special_response = None
+        if msg_lower.startswith(self._special_prefixes):
+            special_response = personality.handle_special_command(
+                user_id=author.id,
+                message=content,
+                user_name=author.name,
+                channel=message.channel
+            )
+
         if special_response:
-            song_recommendations = [
-                re.sub(r'[^\w\s\-]', '', s).strip()
-                for s in re.findall(r'>>\s*(.*?)(?=\n|$)', special_response)
-            ]
-
-            await message.reply(special_response, mention_author=False)
-            if song_recommendations:
-                for song_query in song_recommendations:
-                    if song_query.strip():
-                        ctx = await self.bot.get_context(message)
-                        _, play_response = await self.music_integration.search_and_play(
-                            ctx, song_query.strip()
-                        )
-                        await message.reply(play_response, mention_author=False)
+            await self._dispatch_response_with_songs(message, special_response)
             return
 
         # --- Direct play request (Hindi + English) ---
-        play_song_match = None
-        play_patterns = [
-            r'play\s+(.+)',
-            r'play\s+song\s+(.+)',
-            r'baja\s+(.+)',
-            r'sunao\s+(.+)',
-            r'suna\s+de\s+(.+)'
-        ]
-        for pattern in play_patterns:
-            match = re.match(pattern, msg_lower)
-            if match:
-                play_song_match = match.group(1).strip()
-                break
+        match = _PLAY_INTENT_RE.match(msg_lower)
+        play_song_match = match.group(1).strip() if match else None
 
         if play_song_match:
-            json_response = {
-                "person": message.author.name,
-                "action": "playing",
-                "chat": f"Playing {play_song_match.title()}",
-                "song": play_song_match.title(),
-                "query": f">> {play_song_match}"
-            }
-            logger.info(f"📥 IN: {content}")
-            logger.info(f"📤 OUT: {json.dumps(json_response, indent=2)}")
+            if logger.isEnabledFor(logging.INFO):
+                title = play_song_match.title()
+                encoded = _dumps(_log_payload(
+                    author.name, "playing", f"Playing {title}", title, f">> {play_song_match}"
+                ))
+                logger.info("📥 IN: %s", content)
+                logger.info("📤 OUT: %s", encoded)
 
             await message.reply(f"🎵 Playing **{play_song_match.title()}**!", mention_author=False)
             ctx = await self.bot.get_context(message)
-            _, play_response = await self.music_integration.search_and_play(
+            _, play_response = await music.search_and_play(
                 ctx, play_song_match
             )
             await message.reply(play_response, mention_author=False)
             return
 
+        # --- Rate limit before any typing indicator or service work ---
+        retry_after = self.rate_limiter.try_acquire_nowait(author.id)
+        if retry_after is not None:
+            await message.reply(
+                f"⏳ You're sending messages too fast! Please wait {retry_after:.1f} seconds.",
+                mention_author=False
+            )
+            return
+
         # --- Update activity & music preferences ---
-        self.personality_manager.update_activity(message.author.id)
-        await self.music_integration.update_preferences_from_conversation(message.author.id, content)
+        personality.update_activity(author.id)
+        self._spawn_background(
+            music.update_preferences_from_conversation(author.id, content),
+            "music preference update"
+        )
 
         # --- Process mentions for context ---
         mentioned_users_info = ""
-        if hasattr(message.author, 'guild') and message.author.guild:
+        if hasattr(author, 'guild') and author.guild:
             try:
-                mentions_data = self.personality_manager.process_mentions(message)
+                mentions_data = personality.process_mentions(message)
                 if mentions_data:
-                    mentioned_users_info = "\n\n**Users mentioned in this message:**\n"
+                    parts = ["\n\n**Users mentioned in this message:**"]
                     for mention in mentions_data:
                         can_mention = "✅" if mention["can_mention"] else "❌"
-                        mentioned_users_info += (
+                        parts.append(
                             f"• <@{mention['id']}> - Role: {mention['top_role']}, "
-                            f"Can mention: {can_mention}\n"
+                            f"Can mention: {can_mention}"
                         )
+                    mentioned_users_info = "\n".join(parts) + "\n"
             except Exception as e:
                 logger.error(f"Error processing mentions: {e}")
 
-        user_context = f"User: {message.author.display_name} (ID: {message.author.id})"
-        if mentioned_users_info:
-            user_context += mentioned_users_info
-        enhanced_message = f"[{user_context}] {content}"
+        enhanced_message = f"[User: {author.display_name} (ID: {author.id}){mentioned_users_info}] {content}"
 
         # --- AI processing ---
         try:
-            async with message.channel.typing():
-                response, provider = await self._process_chat_request(
-                    message.author.id,
-                    enhanced_message,
-                    message.channel.id,
-                    message.guild.id if message.guild else None
+            if self.config.features.stream_responses:
+                await self._stream_chat_response(message, content, enhanced_message)
+            else:
+                response, provider = await self._await_with_typing(
+                    message.channel,
+                    self._process_chat_request(
+                        author.id,
+                        enhanced_message,
+                        message.channel.id,
+                        message.guild.id if message.guild else None
+                    )
                 )
 
-            await self._send_response(message, content, response, provider)
+                await self._send_response(message, content, response, provider)
 
             # --- Handle music requests (only on confirmation, not just suggestion) ---
-            if message.author.voice:
+            if author.voice:
                 try:
-                    user_id = message.author.id
+                    user_id = author.id
                     
                     # Check if user is confirming to play music (han, baja, yes, ok, etc)
                     if self._detect_play_confirmation(content):
-                        logger.info(f"🎵 User confirmed to play music")
+                        logger.info("🎵 User confirmed to play music")
                         
                         # Get stored song suggestions from AI response
                         if user_id in self.pending_song_suggestions:
@@ -650,30 +824,30 @@ class ChatCog(commands.Cog):
                             if songs_list:
                                 # Pick first song from suggestions
                                 song_to_play = songs_list[0]
-                                logger.info(f"🎵 Playing first suggested song: {song_to_play}")
+                                logger.info("🎵 Playing first suggested song: %s", song_to_play)
                                 
-                                if message.author.voice:
-                                    _, play_response = await self.music_integration.search_and_play(
+                                if author.voice:
+                                    _, play_response = await music.search_and_play(
                                         message, song_to_play
                                     )
                                     await message.reply(play_response, mention_author=False)
                                     # Clear suggestion after playing
                                     del self.pending_song_suggestions[user_id]
                             else:
-                                logger.info(f"🎵 Empty songs list in storage")
+                                logger.info("🎵 Empty songs list in storage")
                         else:
-                            logger.info(f"🎵 No songs stored, asking user for song name")
+                            logger.info("🎵 No songs stored, asking user for song name")
                             await message.reply("🎵 Kaunsa gaana bajun? Naam bata!", mention_author=False)
                     
                     # Detect if user rejected a song suggestion (clear the stored one)
                     elif self._detect_song_rejection(content):
-                        logger.info(f"🎵 User rejected songs")
+                        logger.info("🎵 User rejected songs")
                         if user_id in self.pending_song_suggestions:
                             del self.pending_song_suggestions[user_id]
                         # AI will naturally suggest another song in its response
                 
                 except Exception as e:
-                    logger.debug(f"Music request handling error: {e}")
+                    logger.debug("Music request handling error: %s", e)
 
         except RateLimitException as e:
             await message.reply(
@@ -700,7 +874,13 @@ class ChatCog(commands.Cog):
         logger.info("=" * 50)
 
     @commands.Cog.listener()
-    async def on_command_error(self, ctx: commands.Context, error: commands.CommandError) -> None:
+    async def on_user_update(self, before: discord.User, after: discord.User) -> None:
+        """Refresh the cached bot identity if the bot account is renamed."""
+        if self.bot.user is not None and after.id == self.bot.user.id and before.name != after.name:
+            self._cache_bot_identity()
+
+    async def cog_command_error(self, ctx: commands.Context, error: commands.CommandError) -> None:
+        """Handle errors for this cog's commands only (the global handler covers the rest)."""
         if isinstance(error, commands.CommandNotFound):
             return
         elif isinstance(error, commands.MissingRequiredArgument):
@@ -736,37 +916,26 @@ class ChatCog(commands.Cog):
             logger.error(f"Error in auto-playlist: {e}")
 
     @staticmethod
-    def _split_message(text: str, max_length: int) -> List[str]:
-        """Split a long message into Discord-compliant chunks."""
-        if len(text) <= max_length:
-            return [text]
-
-        chunks = []
-        remaining = text
-
-        while remaining:
-            if len(remaining) <= max_length:
-                chunks.append(remaining)
-                break
-
-            break_point = max_length
-            para_break = remaining.rfind('\n\n', 0, max_length)
-            if para_break > max_length // 2:
-                break_point = para_break + 2
-            else:
-                sentence_break = remaining.rfind('.\n', 0, max_length)
-                if sentence_break > max_length // 2:
-                    break_point = sentence_break + 2
-                else:
-                    line_break = remaining.rfind('\n', 0, max_length)
-                    if line_break > max_length // 2:
-                        break_point = line_break + 1
-                    else:
-                        space_break = remaining.rfind(' ', 0, max_length)
-                        if space_break > max_length // 2:
-                            break_point = space_break + 1
-
-            chunks.append(remaining[:break_point])
-            remaining = remaining[break_point:]
-
-        return chunks
+    def _iter_chunks(text: str, max_length: int = 2000) -> Iterator[str]:
+        """Yield Discord-compliant chunks of a long message, preferring natural breaks."""
+        # Walk offsets into the original string so only the yielded chunks are copied
+        length = len(text)
+        half = max_length // 2
+        start = 0
+
+        while length - start > max_length:
+            end = start + max_length
+            # Breaks in the first half of the window are never taken, so don't scan there
+            floor = start + half + 1
+            break_point = end
+            for separator in ('\n\n', '.\n', '\n', ' '):
+                found = text.rfind(separator, floor, end)
+                if found != -1:
+                    break_point = found + len(separator)
+                    break
+
+            yield text[start:break_point]
+            start = break_point
+
+        if start < length:
+            yield text[start:]
@@ -9,7 +9,7 @@ import discord
 from discord.ext import commands
 
 import logging
-from datetime import datetime
+from typing import Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,20 @@ logger = logging.getLogger(__name__)
 class StatsCog(commands.Cog):
     """Statistics command handler for the chat system."""
 
+    # /providers never changes, so its embed is described once and rebuilt from this dict
+    _PROVIDERS_EMBED = {
+        "title": "🤖 Available AI Providers",
+        "color": discord.Color.green().value,
+        "fields": [
+            {
+                "name": "✅ Groq",
+                "value": "Model: mixtral-8x7b-32768\nStatus: Active\nType: Open-source LLM",
+                "inline": False,
+            },
+        ],
+        "footer": {"text": "Groq API for fast inference"},
+    }
+
     def __init__(self, bot: commands.Bot, chat_service, rate_limiter, memory_manager, storage):
         self.bot = bot
         self.chat_service = chat_service
@@ -24,23 +38,18 @@ class StatsCog(commands.Cog):
         self.memory_manager = memory_manager
         self.storage = storage
 
+    def _memory_totals(self) -> Tuple[int, int, int]:
+        """Return (channels, guilds, messages) stored on disk."""
+        storage = self.storage
+        return storage.channel_count, storage.guild_count, storage.message_count
+
     @commands.hybrid_command(name="chatstats", description="View chat statistics")
     async def chat_stats(self, ctx: commands.Context) -> None:
         rate_stats = self.rate_limiter.get_global_stats()
 
-        try:
-            all_channels = self.storage._load_all_channel_memories()
-            all_guilds = self.storage._load_all_guild_memories()
-            total_channels = len(all_channels)
-            total_guilds = len(all_guilds)
-            total_messages = (
-                sum(len(m.get("messages", [])) for m in all_channels.values()) +
-                sum(len(m.get("messages", [])) for m in all_guilds.values())
-            )
-        except Exception:
-            total_channels = total_guilds = total_messages = 0
+        total_channels, total_guilds, total_messages = self._memory_totals()
 
-        embed = discord.Embed(title="📊 Chat Statistics", color=discord.Color.blue(), timestamp=datetime.utcnow())
+        embed = discord.Embed(title="📊 Chat Statistics", color=discord.Color.blue(), timestamp=discord.utils.utcnow())
         embed.add_field(
             name="Memory Usage",
             value=f"Active Channels: {total_channels}\nActive Guilds: {total_guilds}\nTotal Messages Stored: {total_messages}",
@@ -57,14 +66,7 @@ class StatsCog(commands.Cog):
 
     @commands.hybrid_command(name="providers", description="List available AI providers")
     async def list_providers(self, ctx: commands.Context) -> None:
-        embed = discord.Embed(title="🤖 Available AI Providers", color=discord.Color.green())
-        embed.add_field(
-            name="✅ Groq",
-            value="Model: mixtral-8x7b-32768\nStatus: Active\nType: Open-source LLM",
-            inline=False
-        )
-        embed.set_footer(text="Groq API for fast inference")
-        await ctx.send(embed=embed)
+        await ctx.send(embed=discord.Embed.from_dict(self._PROVIDERS_EMBED))
 
     @commands.hybrid_command(name="mystats", description="View your personal chat statistics")
     async def my_stats(self, ctx: commands.Context) -> None:
@@ -99,17 +101,7 @@ class StatsCog(commands.Cog):
     @commands.hybrid_command(name="status", description="Detailed chatbot system status")
     async def system_status(self, ctx: commands.Context) -> None:
         rate_stats = self.rate_limiter.get_global_stats()
-        try:
-            all_channels = self.storage._load_all_channel_memories()
-            all_guilds = self.storage._load_all_guild_memories()
-            total_channels = len(all_channels)
-            total_guilds = len(all_guilds)
-            total_messages = (
-                sum(len(m.get("messages", [])) for m in all_channels.values()) +
-                sum(len(m.get("messages", [])) for m in all_guilds.values())
-            )
-        except Exception:
-            total_channels = total_guilds = total_messages = 0
+        total_channels, total_guilds, total_messages = self._memory_totals()
 
         config = self.chat_service.config
 
@@ -117,7 +109,7 @@ class StatsCog(commands.Cog):
             title="🔍 Detailed System Status",
             description="Service: Operational",
             color=discord.Color.blue(),
-            timestamp=datetime.utcnow()
+            timestamp=discord.utils.utcnow()
         )
         embed.add_field(
             name="🟢 System Health",
@@ -148,4 +140,4 @@ class StatsCog(commands.Cog):
             inline=True
         )
         embed.set_footer(text="All systems operational")
-        await ctx.send(embed=embed)
+        await ctx.send(embed=embed, silent=True)
@@ -16,7 +16,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ProviderConfig:
     """Configuration for a single LLM provider."""
     name: str
@@ -33,16 +33,35 @@ class ProviderConfig:
         return bool(self.api_key and self.url and self.model)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RateLimitConfig:
     """Rate limiting configuration."""
     user_cooldown: float = 3.0
     global_requests_per_minute: int = 30
     max_tokens: int = 1000
     request_timeout: float = 30.0
+    max_retries: int = 2
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class ConnectionPoolConfig:
+    """HTTP connection pool shared by all provider requests."""
+    max_connections: int = 100
+    max_keepalive_connections: int = 32
+    keepalive_expiry: float = 300.0
+    http2: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class CacheConfig:
+    """Response cache configuration."""
+    enabled: bool = True
+    ttl_seconds: float = 1800.0
+    max_entries: int = 512
+    max_temperature: float = 0.3
+
+
+@dataclass(frozen=True, slots=True)
 class FeatureConfig:
     """Feature flags configuration."""
     allow_dm: bool = True
@@ -50,9 +69,11 @@ class FeatureConfig:
     enable_clear_command: bool = True
     enable_model_command: bool = True
     enable_stats_command: bool = True
+    stream_responses: bool = False
+    max_songs_per_message: int = 5
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LoggingConfig:
     """Logging configuration."""
     log_level: str = "INFO"
@@ -60,7 +81,7 @@ class LoggingConfig:
     log_history: bool = False
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PersonalityConfig:
     """Configuration for a single AI personality."""
     name: str
@@ -97,6 +118,8 @@ class ChatConfig:
         self.provider_priority: List[str] = []
         
         self.rate_limit = RateLimitConfig()
+        self.connection_pool = ConnectionPoolConfig()
+        self.cache = CacheConfig()
         self.features = FeatureConfig()
         self.logging = LoggingConfig()
         
@@ -123,6 +146,8 @@ class ChatConfig:
         self._load_general_config()
         self._load_provider_configs()
         self._load_rate_limit_config()
+        self._load_connection_pool_config()
+        self._load_cache_config()
         self._load_feature_config()
         self._load_logging_config()
         self._load_personality_config()
@@ -277,7 +302,30 @@ class ChatConfig:
             user_cooldown=self._getfloat(section, 'user_cooldown', 3.0),
             global_requests_per_minute=self._getint(section, 'global_requests_per_minute', 30),
             max_tokens=self._getint(section, 'max_tokens', 1000),
-            request_timeout=self._getfloat(section, 'request_timeout', 30.0)
+            request_timeout=self._getfloat(section, 'request_timeout', 30.0),
+            max_retries=self._getint(section, 'max_retries', 2)
+        )
+    
+    def _load_connection_pool_config(self) -> None:
+        """Load provider HTTP connection pool limits."""
+        section = 'providers'
+        
+        self.connection_pool = ConnectionPoolConfig(
+            max_connections=self._getint(section, 'max_connections', 100),
+            max_keepalive_connections=self._getint(section, 'max_keepalive_connections', 32),
+            keepalive_expiry=self._getfloat(section, 'keepalive_expiry', 300.0),
+            http2=self._getboolean(section, 'http2', False)
+        )
+    
+    def _load_cache_config(self) -> None:
+        """Load response cache configuration."""
+        section = 'cache'
+        
+        self.cache = CacheConfig(
+            enabled=self._getboolean(section, 'enabled', True),
+            ttl_seconds=self._getfloat(section, 'ttl_seconds', 1800.0),
+            max_entries=self._getint(section, 'max_entries', 512),
+            max_temperature=self._getfloat(section, 'max_temperature', 0.3)
         )
     
     def _load_feature_config(self) -> None:
@@ -289,7 +337,9 @@ class ChatConfig:
             show_provider=self._getboolean(section, 'show_provider', True),
             enable_clear_command=self._getboolean(section, 'enable_clear_command', True),
             enable_model_command=self._getboolean(section, 'enable_model_command', True),
-            enable_stats_command=self._getboolean(section, 'enable_stats_command', True)
+            enable_stats_command=self._getboolean(section, 'enable_stats_command', True),
+            stream_responses=self._getboolean(section, 'stream_responses', False),
+            max_songs_per_message=self._getint(section, 'max_songs_per_message', 5)
         )
     
     def _load_logging_config(self) -> None:
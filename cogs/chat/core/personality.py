@@ -6,17 +6,27 @@ Handles AI personality traits, user memory, and special command responses.
 Includes Discord user permission checking and role hierarchy analysis.
 """
 
-import json
+import os
 import time
-import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 import logging
 import discord
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Phrases that ask who is online (answered by the chat cog, which has channel context)
+WHOS_ONLINE_PHRASES = frozenset({"who's online", "who is online", "online users", "active users"})
+
+_HELP_PHRASES = frozenset({"help", "what can you do", "what do you do"})
+_ABOUT_ME_PHRASES = frozenset({
+    "what do you know about me", "what do you know about me?", "tell me about me", "my info"
+})
+_REMEMBER_PREFIX = "remember "
+
 
 @dataclass
 class UserMemory:
@@ -58,6 +68,12 @@ class PersonalityManager:
     
     DEFAULT_MEMORY_PATH = "data/user_memory.json"
     
+    # Leading words of every special command; messages starting with none of
+    # these can skip handle_special_command() entirely
+    special_command_prefixes = tuple(sorted(
+        {phrase.split()[0] for phrase in _HELP_PHRASES | _ABOUT_ME_PHRASES} | {_REMEMBER_PREFIX}
+    ))
+    
     def __init__(
         self,
         memory_path: str = None,
@@ -73,6 +89,13 @@ class PersonalityManager:
         self.memory_path = memory_path or self.DEFAULT_MEMORY_PATH
         self.bot = bot
         
+        # Resolve the file and create its directory once rather than on every save
+        self._memory_file = Path(self.memory_path)
+        self._memory_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # One writer thread keeps saves off the event loop and in submission order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-memory")
+        
         # In-memory storage for user memories
         self._user_memories: Dict[int, UserMemory] = {}
         
@@ -84,14 +107,14 @@ class PersonalityManager:
     def _load_from_disk(self) -> None:
         """Load user memories from disk."""
         try:
-            path = Path(self.memory_path)
+            path = self._memory_file
             
             if not path.exists():
                 logger.debug("No memory file found, starting fresh")
                 return
             
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(path, 'rb') as f:
+                data = orjson.loads(f.read())
             
             self._user_memories = {
                 int(user_id): UserMemory.from_dict(mem_data)
@@ -104,20 +127,28 @@ class PersonalityManager:
             logger.error(f"Failed to load user memories: {e}")
     
     def _save_to_disk(self) -> None:
-        """Save user memories to disk."""
+        """Snapshot user memories and hand the write to the writer thread."""
         try:
-            path = Path(self.memory_path)
-            path.parent.mkdir(parents=True, exist_ok=True)
-            
             data = {
                 "users": {
                     str(user_id): mem.to_dict()
                     for user_id, mem in self._user_memories.items()
                 }
             }
+            self._writer.submit(self._write_file, orjson.dumps(data))
+        except Exception as e:
+            logger.error(f"Failed to save user memories: {e}")
+    
+    def _write_file(self, payload: bytes) -> None:
+        """Write serialized user memories (runs on the writer thread)."""
+        try:
+            path = self._memory_file
             
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            # Write a temp file and swap it in so a crash never leaves a truncated file
+            temp_path = path.with_name(path.name + ".tmp")
+            with open(temp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, path)
             
             logger.debug("User memories saved to disk")
             
@@ -136,7 +167,7 @@ class PersonalityManager:
         if thing not in memory.things_remembered:
             memory.things_remembered.append(thing)
             self._save_to_disk()
-            logger.info(f"User {user_id} remembered: {thing}")
+            logger.debug("User %s remembered: %s", user_id, thing)
     
     def get_remembered(self, user_id: int) -> List[str]:
         """Get all remembered things for a user."""
@@ -278,24 +309,23 @@ class PersonalityManager:
         msg_lower = message.lower().strip()
         
         # Help command
-        if msg_lower in ["help", "what can you do", "what do you do"]:
+        if msg_lower in _HELP_PHRASES:
             return self.format_help_response(user_name)
         
         # Who's online command
-        if msg_lower in ["who's online", "who is online", "online users", "active users"]:
+        if msg_lower in WHOS_ONLINE_PHRASES:
             # We'll handle this in the main chat handler since we need channel context
             return None  # Let main handler deal with it
         
         # Remember command
-        if msg_lower.startswith("remember "):
-            thing = message[9:].strip()  # Remove "remember " prefix
+        if msg_lower.startswith(_REMEMBER_PREFIX):
+            thing = message[len(_REMEMBER_PREFIX):].strip()
             if thing:
                 self.remember(user_id, thing)
                 return self.format_remember_response(thing, user_name)
         
         # What do you know about me
-        if msg_lower in ["what do you know about me", "what do you know about me?", 
-                         "tell me about me", "my info"]:
+        if msg_lower in _ABOUT_ME_PHRASES:
             return self.format_what_know_response(user_id, user_name)
         
         return None
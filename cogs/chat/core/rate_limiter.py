@@ -3,32 +3,43 @@ Rate Limiting System for Chat Module
 ====================================
 
 Implements rate limiting and cooldown mechanisms for the chatbot.
+Per-user limits use a lazily refilled token bucket: each user costs a
+single small record regardless of how many requests they make.
 """
 
 import time
 import asyncio
-from collections import defaultdict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional
 import logging
+from collections import OrderedDict
 
 from .exceptions import RateLimitException
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class UserRateInfo:
     """Rate limit information for a single user."""
-    last_request_time: float = 0.0
+    tokens: float = 0.0
+    last_refill_ns: int = 0   # time.monotonic_ns()
+    last_request_ns: int = 0  # time.monotonic_ns()
     request_count: int = 0
     warning_count: int = 0
 
 
-@dataclass
+# The global window is one minute of one-second buckets
+GLOBAL_WINDOW_SECONDS = 60
+
+
+@dataclass(slots=True)
 class GlobalRateInfo:
     """Global rate limit tracking."""
-    request_times: list = field(default_factory=list)
+    buckets: List[int] = field(default_factory=lambda: [0] * GLOBAL_WINDOW_SECONDS)
+    last_tick: int = 0      # whole time.monotonic() seconds of the newest bucket
+    window_total: int = 0   # sum(buckets), kept incrementally
     total_requests: int = 0
     total_blocked: int = 0
 
@@ -37,15 +48,37 @@ class RateLimiter:
     """
     Rate limiter for the chat module.
     
-    Implements both per-user cooldowns and global rate limiting.
+    Implements both per-user token buckets and global rate limiting.
+    A user's bucket holds up to ``user_burst`` tokens and refills at one
+    token per ``user_cooldown`` seconds, so the default burst of 1 behaves
+    exactly like a fixed cooldown.
     Thread-safe using asyncio locks.
     """
     
+    __slots__ = (
+        'user_cooldown',
+        'user_burst',
+        'global_requests_per_minute',
+        'cleanup_interval',
+        'max_tracked_users',
+        'max_inflight_per_user',
+        '_inflight',
+        '_refill_per_ns',
+        '_user_info',
+        '_global_info',
+        '_user_lock',
+        '_global_lock',
+        '_last_cleanup',
+    )
+    
     def __init__(
         self,
         user_cooldown: float = 3.0,
         global_requests_per_minute: int = 30,
-        cleanup_interval: int = 60
+        cleanup_interval: int = 60,
+        user_burst: int = 1,
+        max_tracked_users: int = 50_000,
+        max_inflight_per_user: int = 2
     ):
         """
         Initialize the rate limiter.
@@ -54,13 +87,21 @@ class RateLimiter:
             user_cooldown: Cooldown between requests per user (seconds)
             global_requests_per_minute: Maximum global requests per minute
             cleanup_interval: Interval for cleaning up old entries (seconds)
+            user_burst: Requests a user may make back-to-back before the cooldown applies
+            max_tracked_users: Upper bound on per-user records (least recently active are dropped)
+            max_inflight_per_user: Concurrent requests a single user may have in progress
         """
         self.user_cooldown = user_cooldown
+        self.user_burst = max(1, user_burst)
+        self._refill_per_ns = self._compute_refill_rate(user_cooldown)
         self.global_requests_per_minute = global_requests_per_minute
         self.cleanup_interval = cleanup_interval
         
         # User tracking
-        self._user_info: Dict[int, UserRateInfo] = defaultdict(UserRateInfo)
+        self.max_tracked_users = max_tracked_users
+        self._user_info: OrderedDict[int, UserRateInfo] = OrderedDict()
+        self.max_inflight_per_user = max_inflight_per_user
+        self._inflight: Dict[int, int] = {}
         
         # Global tracking
         self._global_info = GlobalRateInfo()
@@ -70,13 +111,18 @@ class RateLimiter:
         self._global_lock = asyncio.Lock()
         
         # Last cleanup time
-        self._last_cleanup = time.time()
+        self._last_cleanup = time.monotonic_ns()
         
         logger.info(
             f"RateLimiter initialized: user_cooldown={user_cooldown}s, "
             f"global_limit={global_requests_per_minute}/min"
         )
     
+    @staticmethod
+    def _compute_refill_rate(user_cooldown: float) -> float:
+        """Tokens regained per nanosecond (0 disables the per-user limit)."""
+        return 1.0 / (user_cooldown * 1e9) if user_cooldown > 0 else 0.0
+    
     async def check_user_rate_limit(self, user_id: int) -> Optional[float]:
         """
         Check if a user is rate limited.
@@ -88,27 +134,46 @@ class RateLimiter:
             None if allowed, or retry_after seconds if rate limited
         """
         async with self._user_lock:
-            current_time = time.time()
-            user_info = self._user_info[user_id]
-            
-            # Calculate time since last request
-            time_since_last = current_time - user_info.last_request_time
-            
-            if time_since_last < self.user_cooldown:
-                retry_after = self.user_cooldown - time_since_last
-                user_info.warning_count += 1
-                logger.debug(
-                    f"User {user_id} rate limited. "
-                    f"Retry after: {retry_after:.1f}s "
-                    f"(warning #{user_info.warning_count})"
-                )
-                return retry_after
-            
-            # Update user info
-            user_info.last_request_time = current_time
-            user_info.request_count += 1
-            
-            return None
+            return self._take_user_token(user_id)
+    
+    def _take_user_token(self, user_id: int) -> Optional[float]:
+        """Refill and spend from a user's bucket; never awaits, so it is atomic on the loop."""
+        now_ns = time.monotonic_ns()
+        user_info = self._user_info.get(user_id)
+        if user_info is None:
+            user_info = UserRateInfo(tokens=self.user_burst, last_refill_ns=now_ns)
+            self._user_info[user_id] = user_info
+            if len(self._user_info) > self.max_tracked_users:
+                self._user_info.popitem(last=False)
+        else:
+            self._user_info.move_to_end(user_id)
+        
+        # Refill lazily: one token per cooldown period, capped at the burst size
+        if self._refill_per_ns:
+            user_info.tokens = min(
+                self.user_burst,
+                user_info.tokens + (now_ns - user_info.last_refill_ns) * self._refill_per_ns
+            )
+        else:
+            user_info.tokens = self.user_burst
+        user_info.last_refill_ns = now_ns
+        
+        if user_info.tokens < 1.0:
+            retry_after = (1.0 - user_info.tokens) * self.user_cooldown
+            user_info.warning_count += 1
+            logger.debug(
+                f"User {user_id} rate limited. "
+                f"Retry after: {retry_after:.1f}s "
+                f"(warning #{user_info.warning_count})"
+            )
+            return retry_after
+        
+        # Spend a token and update user info
+        user_info.tokens -= 1.0
+        user_info.last_request_ns = now_ns
+        user_info.request_count += 1
+        
+        return None
     
     async def check_global_rate_limit(self) -> Optional[float]:
         """
@@ -118,30 +183,80 @@ class RateLimiter:
             None if allowed, or retry_after seconds if rate limited
         """
         async with self._global_lock:
-            current_time = time.time()
-            
-            # Clean up old requests (older than 1 minute)
-            minute_ago = current_time - 60
-            self._global_info.request_times = [
-                t for t in self._global_info.request_times if t > minute_ago
-            ]
-            
-            # Check if limit exceeded
-            if len(self._global_info.request_times) >= self.global_requests_per_minute:
-                oldest_in_window = min(self._global_info.request_times)
-                retry_after = oldest_in_window + 60 - current_time
-                self._global_info.total_blocked += 1
-                logger.warning(
-                    f"Global rate limit exceeded. "
-                    f"Retry after: {retry_after:.1f}s"
-                )
-                return max(0, retry_after)
-            
-            # Record this request
-            self._global_info.request_times.append(current_time)
-            self._global_info.total_requests += 1
+            return self._take_global_slot()
+    
+    def _take_global_slot(self) -> Optional[float]:
+        """Record a request in the global window unless it is full; never awaits."""
+        current_time = time.monotonic()
+        now_tick = int(current_time)
+        info = self._advance_global_window(now_tick)
+        
+        # Check if limit exceeded
+        if info.window_total >= self.global_requests_per_minute:
+            # The window frees up when its oldest non-empty bucket expires
+            retry_after = 0.0
+            for tick in range(now_tick - GLOBAL_WINDOW_SECONDS + 1, now_tick + 1):
+                if info.buckets[tick % GLOBAL_WINDOW_SECONDS]:
+                    retry_after = tick + GLOBAL_WINDOW_SECONDS - current_time
+                    break
+            info.total_blocked += 1
+            logger.warning(
+                f"Global rate limit exceeded. "
+                f"Retry after: {retry_after:.1f}s"
+            )
+            return max(0, retry_after)
+        
+        # Record this request
+        info.buckets[now_tick % GLOBAL_WINDOW_SECONDS] += 1
+        info.window_total += 1
+        info.total_requests += 1
+        
+        return None
+    
+    def _advance_global_window(self, now_tick: int) -> GlobalRateInfo:
+        """Zero the buckets that fell out of the window since the last request."""
+        info = self._global_info
+        elapsed = now_tick - info.last_tick
+        if elapsed >= GLOBAL_WINDOW_SECONDS:
+            info.buckets = [0] * GLOBAL_WINDOW_SECONDS
+            info.window_total = 0
+        elif elapsed > 0:
+            buckets = info.buckets
+            for tick in range(info.last_tick + 1, now_tick + 1):
+                slot = tick % GLOBAL_WINDOW_SECONDS
+                info.window_total -= buckets[slot]
+                buckets[slot] = 0
+        if elapsed > 0:
+            info.last_tick = now_tick
+        return info
+    
+    def try_acquire_nowait(self, user_id: int) -> Optional[float]:
+        """
+        Acquire permission to make a request without awaiting.
+        
+        Same checks as acquire(), but cheap enough to run before any
+        typing indicator, defer or service call, so rejected requests
+        cost nothing beyond the bucket update.
+        
+        Args:
+            user_id: Discord user ID
             
-            return None
+        Returns:
+            None if allowed, or retry_after seconds if rate limited
+        """
+        retry_after = self._take_user_token(user_id)
+        if retry_after:
+            return retry_after
+        
+        retry_after = self._take_global_slot()
+        if retry_after:
+            return retry_after
+        
+        now_ns = time.monotonic_ns()
+        if now_ns - self._last_cleanup > self.cleanup_interval * 1_000_000_000:
+            self._prune_idle_users()
+            self._last_cleanup = now_ns
+        return None
     
     async def acquire(self, user_id: int) -> None:
         """
@@ -168,29 +283,63 @@ class RateLimiter:
         # Periodic cleanup
         await self._maybe_cleanup()
     
+    @asynccontextmanager
+    async def guard(self, user_id: int) -> AsyncIterator[None]:
+        """
+        Limit how many requests a user can have in progress at once.
+        
+        The token bucket only bounds how often requests start; this closes
+        the gap where one user keeps several slow requests in flight.
+        
+        Args:
+            user_id: Discord user ID
+            
+        Raises:
+            RateLimitException: If the user already has too many requests in progress
+        """
+        inflight = self._inflight.get(user_id, 0)
+        if inflight >= self.max_inflight_per_user:
+            raise RateLimitException(
+                self.user_cooldown,
+                "Too many requests in progress"
+            )
+        
+        self._inflight[user_id] = inflight + 1
+        try:
+            yield
+        finally:
+            remaining = self._inflight[user_id] - 1
+            if remaining:
+                self._inflight[user_id] = remaining
+            else:
+                del self._inflight[user_id]
+    
     async def _maybe_cleanup(self) -> None:
         """Perform periodic cleanup of old entries."""
-        current_time = time.time()
+        now_ns = time.monotonic_ns()
         
-        if current_time - self._last_cleanup > self.cleanup_interval:
+        if now_ns - self._last_cleanup > self.cleanup_interval * 1_000_000_000:
             await self._cleanup()
-            self._last_cleanup = current_time
+            self._last_cleanup = now_ns
     
     async def _cleanup(self) -> None:
         """Clean up old entries to prevent memory leaks."""
         async with self._user_lock:
-            # Remove users who haven't made requests in the last hour
-            hour_ago = time.time() - 3600
-            users_to_remove = [
-                user_id for user_id, info in self._user_info.items()
-                if info.last_request_time < hour_ago
-            ]
-            
-            for user_id in users_to_remove:
-                del self._user_info[user_id]
-            
-            if users_to_remove:
-                logger.debug(f"Cleaned up {len(users_to_remove)} inactive user entries")
+            self._prune_idle_users()
+    
+    def _prune_idle_users(self) -> None:
+        """Remove users who haven't made requests in the last hour."""
+        hour_ago_ns = time.monotonic_ns() - 3600 * 1_000_000_000
+        users_to_remove = [
+            user_id for user_id, info in self._user_info.items()
+            if info.last_request_ns < hour_ago_ns
+        ]
+        
+        for user_id in users_to_remove:
+            del self._user_info[user_id]
+        
+        if users_to_remove:
+            logger.debug(f"Cleaned up {len(users_to_remove)} inactive user entries")
     
     def get_user_stats(self, user_id: int) -> Dict:
         """Get rate limit statistics for a user."""
@@ -205,15 +354,17 @@ class RateLimiter:
         return {
             "request_count": info.request_count,
             "warning_count": info.warning_count,
-            "last_request_time": info.last_request_time
+            # Report wall-clock time for display; the limiter itself only uses monotonic time
+            "last_request_time": time.time() - (time.monotonic_ns() - info.last_request_ns) / 1e9
         }
     
     def get_global_stats(self) -> Dict:
         """Get global rate limit statistics."""
+        info = self._advance_global_window(int(time.monotonic()))
         return {
-            "requests_last_minute": len(self._global_info.request_times),
-            "total_requests": self._global_info.total_requests,
-            "total_blocked": self._global_info.total_blocked,
+            "requests_last_minute": info.window_total,
+            "total_requests": info.total_requests,
+            "total_blocked": info.total_blocked,
             "limit_per_minute": self.global_requests_per_minute
         }
     
@@ -235,6 +386,7 @@ class RateLimiter:
         """Update rate limiter configuration."""
         if user_cooldown is not None:
             self.user_cooldown = user_cooldown
+            self._refill_per_ns = self._compute_refill_rate(user_cooldown)
         if global_requests_per_minute is not None:
             self.global_requests_per_minute = global_requests_per_minute
         
@@ -13,14 +13,60 @@ Features:
 import logging
 import re
 import random
-import json
 import asyncio
+import functools
 from typing import List, Optional, Dict, Any, Tuple
 import discord
+import orjson
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# Fenced ```json blocks and ">> Song" lines in AI responses
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_SONG_LINE_RE = re.compile(r'>>\s*(.+?)(?:\n|$)')
+
+
+def _songs_from_json_blocks(text: str) -> List[str]:
+    """Extract song names from fenced JSON blocks."""
+    songs = []
+    
+    for match in _JSON_BLOCK_RE.findall(text):
+        try:
+            data = orjson.loads(match)
+            
+            # Check for different JSON formats
+            if isinstance(data, dict):
+                # Type 1: songs array
+                if 'songs' in data and isinstance(data['songs'], list):
+                    songs.extend(data['songs'])
+                # Type 2: song field
+                if 'song' in data:
+                    songs.append(data['song'])
+                # Type 3: query field (for play)
+                if 'query' in data:
+                    query = data['query']
+                    if query.startswith('>>'):
+                        songs.append(query[2:].strip())
+                # Type 4: play_all field
+                if 'play_all' in data:
+                    play_all = data['play_all']
+                    if play_all.startswith('>>'):
+                        songs.append(play_all[2:].strip())
+        except orjson.JSONDecodeError:
+            continue
+    
+    return songs
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_songs(text: str) -> Tuple:
+    """Songs in a response (JSON first, then >> lines); memoized since cached replies repeat."""
+    json_songs = _songs_from_json_blocks(text)
+    if json_songs:
+        return tuple(json_songs)
+    return tuple(s.strip() for s in _SONG_LINE_RE.findall(text))
+
 
 @dataclass
 class MusicPreference:
@@ -72,9 +118,13 @@ class MusicIntegration:
         'classical': ["Für Elise - Beethoven", "Moonlight Sonata - Beethoven", "Canon in D - Pachelbel"]
     }
     
+    # Searches allowed in flight at once across the bot (one search backend)
+    MAX_CONCURRENT_SEARCHES = 4
+    
     def __init__(self, bot: discord.Client):
         self.bot = bot
         self.user_preferences: Dict[int, MusicPreference] = {}
+        self._search_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_SEARCHES)
         logger.info("MusicIntegration initialized")
     
     async def get_or_create_preference(self, user_id: int) -> MusicPreference:
@@ -161,56 +211,13 @@ class MusicIntegration:
         """
         Extract song names from JSON format responses
         """
-        songs = []
-        
-        # Try to find JSON blocks
-        json_pattern = r'```json\s*(.*?)\s*```'
-        matches = re.findall(json_pattern, text, re.DOTALL)
-        
-        for match in matches:
-            try:
-                data = json.loads(match)
-                
-                # Check for different JSON formats
-                if isinstance(data, dict):
-                    # Type 1: songs array
-                    if 'songs' in data and isinstance(data['songs'], list):
-                        songs.extend(data['songs'])
-                    # Type 2: song field
-                    if 'song' in data:
-                        songs.append(data['song'])
-                    # Type 3: query field (for play)
-                    if 'query' in data:
-                        query = data['query']
-                        if query.startswith('>>'):
-                            songs.append(query[2:].strip())
-                    # Type 4: play_all field
-                    if 'play_all' in data:
-                        play_all = data['play_all']
-                        if play_all.startswith('>>'):
-                            songs.append(play_all[2:].strip())
-            except json.JSONDecodeError:
-                continue
-        
-        return songs
+        return _songs_from_json_blocks(text)
     
     def extract_songs_from_text(self, text: str) -> List[str]:
         """
         Extract song names from text (both >> format and JSON)
         """
-        songs = []
-        
-        # First try JSON format
-        json_songs = self.extract_songs_from_json(text)
-        if json_songs:
-            return json_songs
-        
-        # Then try >> format
-        song_pattern = r'>>\s*(.+?)(?:\n|$)'
-        matches = re.findall(song_pattern, text)
-        songs.extend([s.strip() for s in matches])
-        
-        return songs
+        return list(_extract_songs(text))
     
 
     async def search_and_play(self, message: discord.Message, query: str):
@@ -227,42 +234,101 @@ class MusicIntegration:
             return False, "Music player not available"
         
         try:
-            # Step 1: Get or create player
-            player = music_cog.player_manager.get_player(message.guild)
-            player.text_channel = message.channel
+            player, error = await self._get_connected_player(music_cog, message)
+            if error:
+                return False, error
             
-            # Step 2: Connect to voice channel if not connected
-            if not player.voice_client:
-                if not message.author.voice:
-                    return False, "You're not in a voice channel!"
+            # Search using music cog's search manager
+            search_result = await self._search_tracks(music_cog, query)
+            return await self._enqueue_tracks(music_cog, message, player, search_result)
                 
-                success = await player.connect(message.author.voice.channel)
-                if not success:
-                    return False, "Failed to join voice channel!"
+        except Exception as e:
+            logger.error(f"Error playing song: {e}")
+            return False, f"Error playing song: {e}"
+    
+    async def search_and_play_many(
+        self, message: discord.Message, queries: List[str]
+    ) -> List[Tuple[bool, str]]:
+        """
+        Search several songs concurrently and queue them in the given order.
+        
+        The voice connection is made once, the searches overlap, and the
+        results are enqueued sequentially so the queue order matches the
+        order of ``queries``.
+        
+        Returns:
+            One (success, response) tuple per query, in order
+        """
+        if not queries:
+            return []
+        
+        music_cog = self.bot.get_cog('Music')
+        if not music_cog:
+            return [(False, "Music player not available")] * len(queries)
+        
+        try:
+            player, error = await self._get_connected_player(music_cog, message)
+        except Exception as e:
+            logger.error(f"Error playing song: {e}")
+            return [(False, f"Error playing song: {e}")] * len(queries)
+        if error:
+            return [(False, error)] * len(queries)
+        
+        search_results = await asyncio.gather(
+            *(self._search_tracks(music_cog, query) for query in queries),
+            return_exceptions=True
+        )
+        
+        results = []
+        for search_result in search_results:
+            try:
+                if isinstance(search_result, BaseException):
+                    raise search_result
+                results.append(await self._enqueue_tracks(music_cog, message, player, search_result))
+            except Exception as e:
+                logger.error(f"Error playing song: {e}")
+                results.append((False, f"Error playing song: {e}"))
+        return results
+    
+    @staticmethod
+    async def _get_connected_player(music_cog, message: discord.Message):
+        """Get the guild player, joining the author's voice channel if needed."""
+        player = music_cog.player_manager.get_player(message.guild)
+        player.text_channel = message.channel
+        
+        if not player.voice_client:
+            if not message.author.voice:
+                return player, "You're not in a voice channel!"
             
-            # Step 3: Search using music cog's search manager
-            tracks, platform, is_playlist = await music_cog.search_manager.search(
+            success = await player.connect(message.author.voice.channel)
+            if not success:
+                return player, "Failed to join voice channel!"
+        return player, None
+    
+    async def _search_tracks(self, music_cog, query: str):
+        """Search without audio extraction (fast mode), bounded by the search semaphore."""
+        async with self._search_semaphore:
+            return await music_cog.search_manager.search(
                 query, 
                 limit=50,  # Get more results
                 extract_audio=False  # Fast mode
             )
-            
-            if not tracks:
-                return False, "No matching song found!"
-            
-            # Step 4: Handle playlist vs single track using music cog's handlers
-            if is_playlist and len(tracks) > 1:
-                # Use music cog's playlist handler
-                await music_cog._handle_playlist(message, tracks, platform, player)
-                return True, f"Added {len(tracks)} tracks from playlist!"
-            else:
-                # Use music cog's single track handler with pre-extraction
-                await music_cog._handle_single_track(message, tracks[0], player, pre_extract=True)
-                return True, f"Added '{tracks[0]['title']}' to queue!"
-                
-        except Exception as e:
-            logger.error(f"Error playing song: {e}")
-            return False, f"Error playing song: {e}"
+    
+    @staticmethod
+    async def _enqueue_tracks(music_cog, message: discord.Message, player, search_result):
+        """Queue a search result using the music cog's playlist/single track handlers."""
+        tracks, platform, is_playlist = search_result
+        if not tracks:
+            return False, "No matching song found!"
+        
+        if is_playlist and len(tracks) > 1:
+            # Use music cog's playlist handler
+            await music_cog._handle_playlist(message, tracks, platform, player)
+            return True, f"Added {len(tracks)} tracks from playlist!"
+        
+        # Use music cog's single track handler with pre-extraction
+        await music_cog._handle_single_track(message, tracks[0], player, pre_extract=True)
+        return True, f"Added '{tracks[0]['title']}' to queue!"
     
     async def pause_music(self, guild: discord.Guild) -> bool:
         """Pause current playback"""
@@ -438,8 +504,6 @@ class MusicIntegration:
             ]
         }
         
-        import re
-        
         # Check for direct mood phrases first (strongest signal)
         for mood, patterns in direct_mood_phrases.items():
             for pattern in patterns:
@@ -1,7 +1,7 @@
 """Chat request and response models."""
 
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any
 from enum import Enum
 
 
@@ -10,7 +10,7 @@ class ProviderType(Enum):
     GROQ = "groq"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChatRequest:
     """Request to process a chat message."""
     
@@ -25,7 +25,7 @@ class ChatRequest:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChatResponse:
     """Response from chat processing."""
     
@@ -1,12 +1,21 @@
 """Memory models for conversations."""
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from itertools import islice
+from typing import Any, ClassVar, Deque, Dict, List, Optional
+import sys
 import time
 
+import orjson
 
-@dataclass
+
+def _encoded_size(msg: Dict) -> int:
+    """Bytes a message adds to the serialized message list (its JSON plus a separator)."""
+    return len(orjson.dumps(msg)) + 1
+
+
+@dataclass(slots=True)
 class ConversationTurn:
     """Single turn in a conversation (message + response)."""
     
@@ -29,58 +38,81 @@ class ConversationTurn:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ChannelMemory:
     """Memory for a Discord channel."""
     
     channel_id: int
-    messages: List[Dict] = field(default_factory=list)
+    messages: Deque[Dict] = field(default_factory=deque)
     total_messages: int = 0
     total_tokens: int = 0
     created_at: float = field(default_factory=time.time)
     last_updated: float = field(default_factory=time.time)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Serialized size of ``messages``, maintained on every add/remove
+    _size_bytes: int = field(default=0, init=False, repr=False, compare=False)
     
     # Size limits
-    MAX_MESSAGES: int = 100
-    MAX_SIZE_BYTES: int = 100 * 1024  # 100 KB
+    MAX_MESSAGES: ClassVar[int] = 100
+    MAX_SIZE_BYTES: ClassVar[int] = 100 * 1024  # 100 KB
+    
+    def __post_init__(self) -> None:
+        # Bound the history so appends evict the oldest message in O(1)
+        self.messages = deque(self.messages, maxlen=self.MAX_MESSAGES)
+        # Roles decoded from storage are fresh strings; share the interned copies
+        for msg in self.messages:
+            msg["role"] = sys.intern(msg["role"])
+        self._size_bytes = len(orjson.dumps(list(self.messages)))
     
     def add_message(self, role: str, content: str, user_id: Optional[int] = None, tokens: int = 0) -> None:
         """Add message to memory with size enforcement."""
+        now = time.time()
         msg = {
-            "role": role,
+            "role": sys.intern(role),
             "content": content,
-            "timestamp": time.time(),
+            "timestamp": now,
             "user_id": user_id,
             "tokens": tokens,
-            "metadata": {},
         }
         
+        # Make room first so the deque never silently drops an uncounted message
+        if len(self.messages) == self.MAX_MESSAGES:
+            self.pop_oldest()
         self.messages.append(msg)
+        self._size_bytes += _encoded_size(msg)
         self.total_messages += 1
         self.total_tokens += tokens
-        self.last_updated = time.time()
+        self.last_updated = now
         
-        # Enforce message limit
-        while len(self.messages) > self.MAX_MESSAGES:
-            removed = self.messages.pop(0)
-            self.total_tokens -= removed.get("tokens", 0)
-        
-        # Enforce size limit (approximate)
-        import json
-        while len(json.dumps(self.messages).encode()) > self.MAX_SIZE_BYTES:
-            removed = self.messages.pop(0)
-            self.total_tokens -= removed.get("tokens", 0)
+        # Enforce size limit using the running size instead of re-encoding the history
+        while self._size_bytes > self.MAX_SIZE_BYTES and self.messages:
+            self.pop_oldest()
+    
+    def pop_oldest(self) -> Dict:
+        """Remove and return the oldest message, keeping size and token totals in sync."""
+        removed = self.messages.popleft()
+        self._size_bytes -= _encoded_size(removed)
+        self.total_tokens -= removed.get("tokens", 0)
+        return removed
     
     def get_context_messages(self, limit: int = 10) -> List[Dict]:
         """Get recent messages for context."""
-        return self.messages[-limit:] if self.messages else []
+        return list(islice(self.messages, max(len(self.messages) - limit, 0), None))
+    
+    @property
+    def summary(self) -> str:
+        """Summary of older messages folded out of the history."""
+        return self.metadata.get("summary", "")
+    
+    def approx_tokens(self) -> int:
+        """Rough token count of stored messages (~4 characters per token)."""
+        return sum(len(msg["content"]) for msg in self.messages) // 4
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for storage."""
         return {
             "channel_id": self.channel_id,
-            "messages": self.messages,
+            "messages": list(self.messages),
             "total_messages": self.total_messages,
             "total_tokens": self.total_tokens,
             "created_at": self.created_at,
@@ -89,58 +121,81 @@ class ChannelMemory:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class GuildMemory:
     """Memory for a Discord guild (server-wide context)."""
     
     guild_id: int
-    messages: List[Dict] = field(default_factory=list)
+    messages: Deque[Dict] = field(default_factory=deque)
     total_messages: int = 0
     total_tokens: int = 0
     created_at: float = field(default_factory=time.time)
     last_updated: float = field(default_factory=time.time)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Serialized size of ``messages``, maintained on every add/remove
+    _size_bytes: int = field(default=0, init=False, repr=False, compare=False)
     
     # Size limits (larger for guild-wide context)
-    MAX_MESSAGES: int = 200
-    MAX_SIZE_BYTES: int = 500 * 1024  # 500 KB
+    MAX_MESSAGES: ClassVar[int] = 200
+    MAX_SIZE_BYTES: ClassVar[int] = 500 * 1024  # 500 KB
+    
+    def __post_init__(self) -> None:
+        # Bound the history so appends evict the oldest message in O(1)
+        self.messages = deque(self.messages, maxlen=self.MAX_MESSAGES)
+        # Roles decoded from storage are fresh strings; share the interned copies
+        for msg in self.messages:
+            msg["role"] = sys.intern(msg["role"])
+        self._size_bytes = len(orjson.dumps(list(self.messages)))
     
     def add_message(self, role: str, content: str, user_id: Optional[int] = None, tokens: int = 0) -> None:
         """Add message to memory with size enforcement."""
+        now = time.time()
         msg = {
-            "role": role,
+            "role": sys.intern(role),
             "content": content,
-            "timestamp": time.time(),
+            "timestamp": now,
             "user_id": user_id,
             "tokens": tokens,
-            "metadata": {},
         }
         
+        # Make room first so the deque never silently drops an uncounted message
+        if len(self.messages) == self.MAX_MESSAGES:
+            self.pop_oldest()
         self.messages.append(msg)
+        self._size_bytes += _encoded_size(msg)
         self.total_messages += 1
         self.total_tokens += tokens
-        self.last_updated = time.time()
-        
-        # Enforce message limit
-        while len(self.messages) > self.MAX_MESSAGES:
-            removed = self.messages.pop(0)
-            self.total_tokens -= removed.get("tokens", 0)
+        self.last_updated = now
         
-        # Enforce size limit (approximate)
-        import json
-        while len(json.dumps(self.messages).encode()) > self.MAX_SIZE_BYTES:
-            removed = self.messages.pop(0)
-            self.total_tokens -= removed.get("tokens", 0)
+        # Enforce size limit using the running size instead of re-encoding the history
+        while self._size_bytes > self.MAX_SIZE_BYTES and self.messages:
+            self.pop_oldest()
+    
+    def pop_oldest(self) -> Dict:
+        """Remove and return the oldest message, keeping size and token totals in sync."""
+        removed = self.messages.popleft()
+        self._size_bytes -= _encoded_size(removed)
+        self.total_tokens -= removed.get("tokens", 0)
+        return removed
     
     def get_context_messages(self, limit: int = 20) -> List[Dict]:
         """Get recent messages for context."""
-        return self.messages[-limit:] if self.messages else []
+        return list(islice(self.messages, max(len(self.messages) - limit, 0), None))
+    
+    @property
+    def summary(self) -> str:
+        """Summary of older messages folded out of the history."""
+        return self.metadata.get("summary", "")
+    
+    def approx_tokens(self) -> int:
+        """Rough token count of stored messages (~4 characters per token)."""
+        return sum(len(msg["content"]) for msg in self.messages) // 4
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for storage."""
         return {
             "guild_id": self.guild_id,
-            "messages": self.messages,
+            "messages": list(self.messages),
             "total_messages": self.total_messages,
             "total_tokens": self.total_tokens,
             "created_at": self.created_at,
@@ -1,12 +1,14 @@
 """Services module - Business logic layer (framework-independent)."""
 
 from .chat_service import ChatService
+from .llm_cache import LLMCache
 from .memory_manager import MemoryManager
 from .provider_router import ProviderRouter
 from .safety_filter import SafetyFilter
 
 __all__ = [
     "ChatService",
+    "LLMCache",
     "MemoryManager",
     "ProviderRouter",
     "SafetyFilter",
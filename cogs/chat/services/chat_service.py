@@ -1,7 +1,8 @@
 """Main chat service orchestrating all layers."""
 
+import asyncio
 import logging
-from typing import Tuple, Optional
+from typing import Any, AsyncIterator, Tuple, Optional
 
 from ..models.chat import ProviderType
 from .memory_manager import MemoryManager
@@ -19,7 +20,8 @@ class ChatService:
         config,
         memory_manager: MemoryManager,
         safety_filter: SafetyFilter,
-        provider_router: ProviderRouter
+        provider_router: ProviderRouter,
+        summary_threshold_tokens: int = 8000
     ):
         """
         Initialize chat service.
@@ -29,11 +31,14 @@ class ChatService:
             memory_manager: Memory management service
             safety_filter: Safety/validation service
             provider_router: Provider routing service
+            summary_threshold_tokens: Stored history size that triggers summarization
         """
         self.config = config
         self.memory_manager = memory_manager
         self.safety_filter = safety_filter
         self.provider_router = provider_router
+        self.summary_threshold_tokens = summary_threshold_tokens
+        self._background_tasks: set = set()
     
     async def process_message(
         self,
@@ -65,9 +70,91 @@ class ChatService:
         Raises:
             ValueError: If validation fails
         """
+        selected_personality, context = await self._prepare_request(
+            user_id, channel_id, message, guild_id, use_channel_memory, use_guild_memory
+        )
+        
+        # Step 3: Route to provider with selected personality
+        try:
+            response_text, provider = await self.provider_router.route_request(
+                message=message,
+                context=context,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                personality=selected_personality
+            )
+        except Exception as e:
+            logger.error(f"Provider error: {e}")
+            raise
+        
+        await self._save_turn(
+            user_id, channel_id, message, response_text, guild_id,
+            use_channel_memory, use_guild_memory
+        )
+        return response_text, provider
+    
+    async def stream_message(
+        self,
+        user_id: int,
+        channel_id: int,
+        message: str,
+        guild_id: Optional[int] = None,
+        use_channel_memory: bool = True,
+        use_guild_memory: bool = True,
+        max_tokens: int = 1000,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """
+        Process a user message, yielding the response as it is generated.
+        
+        Same pipeline as process_message(). The fragments are raw provider
+        output and must be redacted before display; the complete response
+        is redacted before it is saved to memory.
+        
+        Yields:
+            Response text fragments in order
+            
+        Raises:
+            ValueError: If validation fails
+        """
+        selected_personality, context = await self._prepare_request(
+            user_id, channel_id, message, guild_id, use_channel_memory, use_guild_memory
+        )
+        
+        parts = []
+        try:
+            async for delta in self.provider_router.stream_request(
+                message=message,
+                context=context,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                personality=selected_personality
+            ):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error(f"Provider error: {e}")
+            raise
+        
+        response_text = self.safety_filter.redact_secrets("".join(parts))
+        await self._save_turn(
+            user_id, channel_id, message, response_text, guild_id,
+            use_channel_memory, use_guild_memory
+        )
+    
+    async def _prepare_request(
+        self,
+        user_id: int,
+        channel_id: int,
+        message: str,
+        guild_id: Optional[int],
+        use_channel_memory: bool,
+        use_guild_memory: bool
+    ) -> Tuple[Any, str]:
+        """Select the personality, validate input and build the context."""
         # Step 0: Determine personality for this channel
         selected_personality = self.config.get_channel_personality(channel_id)
-        logger.info(f"[Personality] Using: {selected_personality.name} for channel {channel_id}")
+        logger.debug("[Personality] Using: %s for channel %s", selected_personality.name, channel_id)
         
         # Step 1: Validate user input
         valid, error = await self.safety_filter.validate_user_input(message)
@@ -98,47 +185,63 @@ class ChatService:
             logger.warning(f"Context too long, trimming: {error}")
             context = context[:self.safety_filter.max_context_length]
         
-        # Step 3: Route to provider with selected personality
-        try:
-            response_text, provider = await self.provider_router.route_request(
-                message=message,
-                context=context,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                personality=selected_personality
-            )
-        except Exception as e:
-            logger.error(f"Provider error: {e}")
-            raise
-        
+        return selected_personality, context
+    
+    async def _save_turn(
+        self,
+        user_id: int,
+        channel_id: int,
+        message: str,
+        response_text: str,
+        guild_id: Optional[int],
+        use_channel_memory: bool,
+        use_guild_memory: bool
+    ) -> None:
+        """Store a completed exchange and schedule history compaction."""
         # Step 4: Save to memory (async, non-blocking)
         try:
-            # Save user message
+            # Save the user message and AI response together as one turn
             if use_channel_memory:
-                await self.memory_manager.add_to_channel_memory(
-                    channel_id, "user", message, user_id
+                await self.memory_manager.add_turn_to_channel_memory(
+                    channel_id, message, response_text, user_id
                 )
             
             if use_guild_memory and guild_id:
-                await self.memory_manager.add_to_guild_memory(
-                    guild_id, "user", message, user_id
-                )
-            
-            # Save AI response
-            if use_channel_memory:
-                await self.memory_manager.add_to_channel_memory(
-                    channel_id, "assistant", response_text
-                )
-            
-            if use_guild_memory and guild_id:
-                await self.memory_manager.add_to_guild_memory(
-                    guild_id, "assistant", response_text
+                await self.memory_manager.add_turn_to_guild_memory(
+                    guild_id, message, response_text, user_id
                 )
         except Exception as e:
             logger.error(f"Failed to save to memory: {e}")
             # Don't fail the request just because memory save failed
         
-        return response_text, provider
+        # Step 5: Summarize old history in the background once it grows too large
+        task = asyncio.create_task(self._compact_memories(
+            channel_id if use_channel_memory else None,
+            guild_id if use_guild_memory else None
+        ))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _compact_memories(self, channel_id: Optional[int], guild_id: Optional[int]) -> None:
+        """Fold old channel/guild history into summaries when over budget."""
+        # The two summaries are independent requests, so run them concurrently
+        compactions = []
+        if channel_id:
+            compactions.append(self.memory_manager.compact_channel_memory(
+                channel_id,
+                self.provider_router.summarize,
+                max_tokens=self.summary_threshold_tokens
+            ))
+        if guild_id:
+            compactions.append(self.memory_manager.compact_guild_memory(
+                guild_id,
+                self.provider_router.summarize,
+                max_tokens=self.summary_threshold_tokens
+            ))
+        
+        for result in await asyncio.gather(*compactions, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"History compaction failed: {result}")
     
     async def clear_channel_context(self, channel_id: int) -> None:
         """Clear conversation memory for a channel."""
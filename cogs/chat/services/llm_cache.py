@@ -0,0 +1,88 @@
+"""Response caching for LLM requests."""
+
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """
+    Exact-match cache for LLM responses.
+    
+    Entries are keyed by a hash of the full request (model, messages,
+    temperature, max_tokens), so a hit is only possible when the provider
+    would have received a byte-identical request. High-temperature requests
+    are never cached since their answers are expected to vary.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl: float = 1800.0,
+        max_entries: int = 512,
+        max_temperature: float = 0.3
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            enabled: When False every request bypasses the cache
+            ttl: Seconds a cached response stays valid
+            max_entries: Maximum number of cached responses
+            max_temperature: Requests above this temperature bypass the cache
+        """
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_temperature = max_temperature
+        self._entries: Dict[bytes, Tuple[float, str]] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def is_cacheable(self, temperature: float) -> bool:
+        """Check whether a request with this temperature may use the cache."""
+        return self.enabled and temperature <= self.max_temperature
+    
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> bytes:
+        """Build a compact cache key from the request parameters."""
+        payload = orjson.dumps((model, messages, temperature, max_tokens))
+        return hashlib.blake2b(payload, digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the cached response for a key, or None if missing/expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        stored_at, response = entry
+        if time.monotonic() - stored_at >= self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return response
+    
+    def set(self, key: bytes, response: str) -> None:
+        """Store a response, evicting the oldest entry when full."""
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic(), response)
+    
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,27 +1,145 @@
 """Memory management service for conversation context."""
 
+import asyncio
 import logging
-from typing import Dict, Optional, List
+import re
+from collections import OrderedDict
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Optional, List, Tuple, Union
 
 from ..models.memory import ChannelMemory, GuildMemory
 from ..storage.memory_storage import MemoryStorage
 
 logger = logging.getLogger(__name__)
 
+Summarizer = Callable[[str], Awaitable[str]]
+
+# Fallback summary: keep sentences that look factual (questions, exclamations, numbers, names)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_SALIENT_RE = re.compile(r'[!?\d]|\s[A-Z][a-z]+')
+HEURISTIC_SUMMARY_CHARS = 1500
+
+# Line prefix per stored role; anything that isn't the user is the AI
+_ROLE_PREFIXES = {"user": "User: "}
+_AI_PREFIX = "AI: "
+
+
+def _heuristic_summary(summary: str, messages: List[Dict]) -> str:
+    """Condense messages without an LLM by keeping their salient sentences."""
+    kept = [summary] if summary else []
+    for msg in messages:
+        prefix = _ROLE_PREFIXES.get(msg["role"], _AI_PREFIX)
+        for sentence in _SENTENCE_SPLIT_RE.split(msg["content"].strip()):
+            if _SALIENT_RE.search(sentence):
+                kept.append(prefix + sentence)
+    # Keep the most recent facts when the result is over budget
+    return " ".join(kept)[-HEURISTIC_SUMMARY_CHARS:]
+
 
 class MemoryManager:
     """Manages conversation memory for channels and guilds."""
     
-    def __init__(self, storage: MemoryStorage):
+    __slots__ = (
+        'storage',
+        'max_cached_channels',
+        'max_cached_guilds',
+        '_channel_cache',
+        '_guild_cache',
+        '_compacting',
+        'flush_interval',
+        '_dirty_channels',
+        '_dirty_guilds',
+        '_flush_task',
+        '_channel_context',
+        '_guild_context',
+        '_channel_loads',
+        '_guild_loads',
+    )
+    
+    def __init__(
+        self,
+        storage: MemoryStorage,
+        max_cached_channels: int = 1000,
+        max_cached_guilds: int = 500,
+        flush_interval: float = 3.0
+    ):
         """
         Initialize memory manager.
         
         Args:
             storage: Storage backend for persistence
+            max_cached_channels: Channel memories kept in RAM (least recently used are dropped)
+            max_cached_guilds: Guild memories kept in RAM (least recently used are dropped)
+            flush_interval: Seconds to coalesce changes before writing them to storage
         """
         self.storage = storage
-        self._channel_cache: Dict[int, ChannelMemory] = {}
-        self._guild_cache: Dict[int, GuildMemory] = {}
+        self.max_cached_channels = max_cached_channels
+        self.max_cached_guilds = max_cached_guilds
+        self._channel_cache: OrderedDict[int, ChannelMemory] = OrderedDict()
+        self._guild_cache: OrderedDict[int, GuildMemory] = OrderedDict()
+        self._compacting: set = set()
+        self.flush_interval = flush_interval
+        self._dirty_channels: set = set()
+        self._dirty_guilds: set = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Formatted context per cached memory as (limit, text); dropped whenever the memory changes
+        self._channel_context: Dict[int, Tuple[int, str]] = {}
+        self._guild_context: Dict[int, Tuple[int, str]] = {}
+        # In-flight storage loads per ID, so concurrent requests share one memory object
+        self._channel_loads: Dict[int, asyncio.Task] = {}
+        self._guild_loads: Dict[int, asyncio.Task] = {}
+    
+    def _mark_channel_dirty(self, channel_id: int) -> None:
+        """Queue a cached channel memory for the next flush."""
+        self._channel_context.pop(channel_id, None)
+        self._dirty_channels.add(channel_id)
+        self._schedule_flush()
+    
+    def _mark_guild_dirty(self, guild_id: int) -> None:
+        """Queue a cached guild memory for the next flush."""
+        self._guild_context.pop(guild_id, None)
+        self._dirty_guilds.add(guild_id)
+        self._schedule_flush()
+    
+    def _schedule_flush(self) -> None:
+        """Start a delayed flush unless one is already pending."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+    
+    async def _delayed_flush(self) -> None:
+        """Wait out the flush interval so a burst of messages becomes one write per memory."""
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        finally:
+            self._flush_task = None
+        # Changes made while the save was running found this task still active
+        # and did not schedule their own flush; pick them up now
+        if self._dirty_channels or self._dirty_guilds:
+            self._schedule_flush()
+    
+    async def flush(self) -> None:
+        """Write every memory changed since the last flush to storage."""
+        # Swap the sets first so changes made while saving stay dirty for the next flush
+        channel_ids, self._dirty_channels = self._dirty_channels, set()
+        guild_ids, self._dirty_guilds = self._dirty_guilds, set()
+        
+        channel_cache = self._channel_cache
+        guild_cache = self._guild_cache
+        failed_channels, failed_guilds = await self.storage.save_memories(
+            {cid: channel_cache[cid].to_dict() for cid in channel_ids if cid in channel_cache},
+            {gid: guild_cache[gid].to_dict() for gid in guild_ids if gid in guild_cache},
+        )
+        # Keep failed writes dirty so the next flush retries them
+        self._dirty_channels.update(failed_channels)
+        self._dirty_guilds.update(failed_guilds)
+    
+    async def close(self) -> None:
+        """Cancel the pending delayed flush and write outstanding changes now."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
     
     async def get_or_create_channel_memory(self, channel_id: int) -> ChannelMemory:
         """
@@ -34,18 +152,39 @@ class MemoryManager:
             ChannelMemory object
         """
         # Check cache first
-        if channel_id in self._channel_cache:
-            return self._channel_cache[channel_id]
+        memory = self._channel_cache.get(channel_id)
+        if memory is not None:
+            self._channel_cache.move_to_end(channel_id)
+            return memory
         
-        # Load from storage
+        # Join a load already running for this channel instead of racing it
+        load = self._channel_loads.get(channel_id)
+        if load is None:
+            load = asyncio.create_task(self._load_channel_memory(channel_id))
+            self._channel_loads[channel_id] = load
+            load.add_done_callback(lambda _: self._channel_loads.pop(channel_id, None))
+        return await asyncio.shield(load)
+    
+    async def _load_channel_memory(self, channel_id: int) -> ChannelMemory:
+        """Load a channel memory from storage (or create it) and cache it."""
         data = await self.storage.load_channel_memory(channel_id)
         if data:
             memory = self._dict_to_channel_memory(data)
         else:
             memory = ChannelMemory(channel_id=channel_id)
         
-        # Cache it
+        # Cache it, writing out the evicted entry first if it has unflushed changes
         self._channel_cache[channel_id] = memory
+        if len(self._channel_cache) > self.max_cached_channels:
+            evicted_id, evicted = self._channel_cache.popitem(last=False)
+            self._channel_context.pop(evicted_id, None)
+            if evicted_id in self._dirty_channels:
+                self._dirty_channels.discard(evicted_id)
+                if not await self.storage.save_channel_memory(evicted_id, evicted.to_dict()):
+                    # Keep it cached and dirty rather than losing the changes
+                    self._channel_cache[evicted_id] = evicted
+                    self._channel_cache.move_to_end(evicted_id, last=False)
+                    self._mark_channel_dirty(evicted_id)
         return memory
     
     async def get_or_create_guild_memory(self, guild_id: int) -> GuildMemory:
@@ -59,18 +198,39 @@ class MemoryManager:
             GuildMemory object
         """
         # Check cache first
-        if guild_id in self._guild_cache:
-            return self._guild_cache[guild_id]
+        memory = self._guild_cache.get(guild_id)
+        if memory is not None:
+            self._guild_cache.move_to_end(guild_id)
+            return memory
         
-        # Load from storage
+        # Join a load already running for this guild instead of racing it
+        load = self._guild_loads.get(guild_id)
+        if load is None:
+            load = asyncio.create_task(self._load_guild_memory(guild_id))
+            self._guild_loads[guild_id] = load
+            load.add_done_callback(lambda _: self._guild_loads.pop(guild_id, None))
+        return await asyncio.shield(load)
+    
+    async def _load_guild_memory(self, guild_id: int) -> GuildMemory:
+        """Load a guild memory from storage (or create it) and cache it."""
         data = await self.storage.load_guild_memory(guild_id)
         if data:
             memory = self._dict_to_guild_memory(data)
         else:
             memory = GuildMemory(guild_id=guild_id)
         
-        # Cache it
+        # Cache it, writing out the evicted entry first if it has unflushed changes
         self._guild_cache[guild_id] = memory
+        if len(self._guild_cache) > self.max_cached_guilds:
+            evicted_id, evicted = self._guild_cache.popitem(last=False)
+            self._guild_context.pop(evicted_id, None)
+            if evicted_id in self._dirty_guilds:
+                self._dirty_guilds.discard(evicted_id)
+                if not await self.storage.save_guild_memory(evicted_id, evicted.to_dict()):
+                    # Keep it cached and dirty rather than losing the changes
+                    self._guild_cache[evicted_id] = evicted
+                    self._guild_cache.move_to_end(evicted_id, last=False)
+                    self._mark_guild_dirty(evicted_id)
         return memory
     
     async def add_to_channel_memory(
@@ -84,9 +244,7 @@ class MemoryManager:
         """Add message to channel memory."""
         memory = await self.get_or_create_channel_memory(channel_id)
         memory.add_message(role, content, user_id, tokens)
-        
-        # Save to storage
-        await self.storage.save_channel_memory(channel_id, memory.to_dict())
+        self._mark_channel_dirty(channel_id)
     
     async def add_to_guild_memory(
         self, 
@@ -99,9 +257,33 @@ class MemoryManager:
         """Add message to guild memory."""
         memory = await self.get_or_create_guild_memory(guild_id)
         memory.add_message(role, content, user_id, tokens)
-        
-        # Save to storage
-        await self.storage.save_guild_memory(guild_id, memory.to_dict())
+        self._mark_guild_dirty(guild_id)
+    
+    async def add_turn_to_channel_memory(
+        self,
+        channel_id: int,
+        user_message: str,
+        response: str,
+        user_id: Optional[int] = None
+    ) -> None:
+        """Add a user message and the AI reply to channel memory as one update."""
+        memory = await self.get_or_create_channel_memory(channel_id)
+        memory.add_message("user", user_message, user_id)
+        memory.add_message("assistant", response)
+        self._mark_channel_dirty(channel_id)
+    
+    async def add_turn_to_guild_memory(
+        self,
+        guild_id: int,
+        user_message: str,
+        response: str,
+        user_id: Optional[int] = None
+    ) -> None:
+        """Add a user message and the AI reply to guild memory as one update."""
+        memory = await self.get_or_create_guild_memory(guild_id)
+        memory.add_message("user", user_message, user_id)
+        memory.add_message("assistant", response)
+        self._mark_guild_dirty(guild_id)
     
     async def get_channel_context(self, channel_id: int, limit: int = 10) -> str:
         """
@@ -115,18 +297,13 @@ class MemoryManager:
             Formatted context string for LLM
         """
         memory = await self.get_or_create_channel_memory(channel_id)
-        messages = memory.get_context_messages(limit)
-        
-        if not messages:
-            return ""
-        
-        context_lines = []
-        for msg in messages:
-            role = "User" if msg["role"] == "user" else "AI"
-            content = msg["content"]
-            context_lines.append(f"{role}: {content}")
+        cached = self._channel_context.get(channel_id)
+        if cached is not None and cached[0] == limit:
+            return cached[1]
         
-        return "\n".join(context_lines)
+        context = self._format_context(memory.summary, memory.get_context_messages(limit))
+        self._channel_context[channel_id] = (limit, context)
+        return context
     
     async def get_guild_context(self, guild_id: int, limit: int = 20) -> str:
         """
@@ -140,36 +317,136 @@ class MemoryManager:
             Formatted context string for LLM
         """
         memory = await self.get_or_create_guild_memory(guild_id)
-        messages = memory.get_context_messages(limit)
+        cached = self._guild_context.get(guild_id)
+        if cached is not None and cached[0] == limit:
+            return cached[1]
         
-        if not messages:
-            return ""
+        context = self._format_context(memory.summary, memory.get_context_messages(limit))
+        self._guild_context[guild_id] = (limit, context)
+        return context
+    
+    async def compact_channel_memory(
+        self,
+        channel_id: int,
+        summarizer: Summarizer,
+        max_tokens: int = 8000,
+        keep_recent: int = 10
+    ) -> bool:
+        """
+        Fold old channel history into a summary once it exceeds a token budget.
         
-        context_lines = []
-        for msg in messages:
-            role = "User" if msg["role"] == "user" else "AI"
-            content = msg["content"]
-            context_lines.append(f"{role}: {content}")
+        Args:
+            channel_id: Discord channel ID
+            summarizer: Async callable turning a transcript into a short summary
+            max_tokens: Approximate token budget for stored history
+            keep_recent: Number of most recent messages kept verbatim
+            
+        Returns:
+            True if the memory was compacted
+        """
+        key = ("channel", channel_id)
+        if key in self._compacting:
+            return False
+        
+        self._compacting.add(key)
+        try:
+            memory = await self.get_or_create_channel_memory(channel_id)
+            if not await self._compact(memory, summarizer, max_tokens, keep_recent):
+                return False
+            self._mark_channel_dirty(channel_id)
+            logger.info(f"Compacted history for channel {channel_id}")
+            return True
+        finally:
+            self._compacting.discard(key)
+    
+    async def compact_guild_memory(
+        self,
+        guild_id: int,
+        summarizer: Summarizer,
+        max_tokens: int = 8000,
+        keep_recent: int = 10
+    ) -> bool:
+        """
+        Fold old guild history into a summary once it exceeds a token budget.
+        
+        Args:
+            guild_id: Discord guild ID
+            summarizer: Async callable turning a transcript into a short summary
+            max_tokens: Approximate token budget for stored history
+            keep_recent: Number of most recent messages kept verbatim
+            
+        Returns:
+            True if the memory was compacted
+        """
+        key = ("guild", guild_id)
+        if key in self._compacting:
+            return False
+        
+        self._compacting.add(key)
+        try:
+            memory = await self.get_or_create_guild_memory(guild_id)
+            if not await self._compact(memory, summarizer, max_tokens, keep_recent):
+                return False
+            self._mark_guild_dirty(guild_id)
+            logger.info(f"Compacted history for guild {guild_id}")
+            return True
+        finally:
+            self._compacting.discard(key)
+    
+    @classmethod
+    async def _compact(
+        cls,
+        memory: Union[ChannelMemory, GuildMemory],
+        summarizer: Summarizer,
+        max_tokens: int,
+        keep_recent: int
+    ) -> bool:
+        """Summarize all but the most recent messages of a memory."""
+        if len(memory.messages) <= keep_recent or memory.approx_tokens() <= max_tokens:
+            return False
+        
+        older = list(islice(memory.messages, len(memory.messages) - keep_recent))
+        try:
+            summary = await summarizer(cls._format_context(memory.summary, older))
+        except Exception as e:
+            logger.warning(f"Summarizer failed, using heuristic summary: {e}")
+            summary = ""
+        if not summary:
+            # Still shrink the history so the prompt stays within budget
+            summary = _heuristic_summary(memory.summary, older)
+        if not summary:
+            return False
+        
+        # Messages may have been added while summarizing; drop only the ones summarized
+        summarized = {id(msg) for msg in older}
+        while memory.messages and id(memory.messages[0]) in summarized:
+            memory.pop_oldest()
+        memory.metadata["summary"] = summary
+        return True
+    
+    @staticmethod
+    def _format_context(summary: str, messages: List[Dict]) -> str:
+        """Format a summary and messages as "User:/AI:" context lines."""
+        prefixes = _ROLE_PREFIXES
+        context_lines = [prefixes.get(msg["role"], _AI_PREFIX) + msg["content"] for msg in messages]
+        if summary:
+            context_lines.insert(0, f"Summary of earlier conversation: {summary}")
         
         return "\n".join(context_lines)
     
     async def clear_channel_memory(self, channel_id: int) -> None:
         """Clear all memory for a channel."""
-        if channel_id in self._channel_cache:
-            del self._channel_cache[channel_id]
-        
-        # Create empty memory and save it
-        empty_memory = ChannelMemory(channel_id=channel_id)
-        await self.storage.save_channel_memory(channel_id, empty_memory.to_dict())
+        # Replace the cached memory with an empty one; the next flush persists it
+        self._channel_cache[channel_id] = ChannelMemory(channel_id=channel_id)
+        self._channel_cache.move_to_end(channel_id)
+        self._mark_channel_dirty(channel_id)
     
     async def clear_guild_memory(self, guild_id: int) -> None:
         """Clear all memory for a guild."""
-        if guild_id in self._guild_cache:
-            del self._guild_cache[guild_id]
-        
-        # Create empty memory and save it
-        empty_memory = GuildMemory(guild_id=guild_id)
-        await self.storage.save_guild_memory(guild_id, empty_memory.to_dict())
+        # Replace the cached memory with an empty one; the next flush persists it
+        self._guild_cache[guild_id] = GuildMemory(guild_id=guild_id)
+        self._guild_cache.move_to_end(guild_id)
+        self._mark_guild_dirty(guild_id)
     
     @staticmethod
     def _dict_to_channel_memory(data: Dict) -> ChannelMemory:
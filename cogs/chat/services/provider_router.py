@@ -1,17 +1,46 @@
 """Provider routing for AI service selection."""
 
+import asyncio
 import logging
 import time
-from typing import Tuple, Optional
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Tuple, Optional
 
 from ..models.chat import ProviderType
+from .llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class ModelHealth:
+    """Request outcome bookkeeping for a single model."""
+    consecutive_failures: int = 0
+    total_requests: int = 0
+    total_failures: int = 0
+    last_failure: float = 0.0   # time.monotonic()
+    avg_response_us: int = 0    # moving average, integer microseconds
+    open_until: float = 0.0     # circuit breaker: skip the model until then (0 = closed)
+
+
 class ProviderRouter:
     """Routes requests to appropriate AI provider (currently Groq only)."""
     
+    # Circuit breaker cooldown after consecutive failures: 2s, 4s, 8s, ... up to 60s
+    BREAKER_BASE_COOLDOWN = 2.0
+    BREAKER_MAX_COOLDOWN = 60.0
+    # Failures of other kinds in a row before the breaker opens anyway
+    BREAKER_FAILURE_THRESHOLD = 3
+    
+    # Provider error bodies can be whole HTML pages; only this much is scanned and logged
+    ERROR_TEXT_LIMIT = 500
+    
+    SUMMARY_PROMPT = (
+        "Summarize the following Discord conversation in a few sentences so it can "
+        "be used as context later. Keep names, facts, preferences and open questions; "
+        "drop greetings and small talk. Reply with the summary only."
+    )
+    
     def __init__(self, config, safety_filter):
         """
         Initialize provider router.
@@ -25,6 +54,37 @@ class ProviderRouter:
         self.groq_client = None
         self.groq_model = "llama-3.3-70b-versatile"
         self.groq_fallback_models = []
+        cache_config = config.cache
+        self.cache = LLMCache(
+            enabled=cache_config.enabled,
+            ttl=cache_config.ttl_seconds,
+            max_entries=cache_config.max_entries,
+            max_temperature=cache_config.max_temperature
+        )
+        
+        # Shared tasks for cacheable requests currently being answered, by cache key
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        
+        # Per-model outcomes; updates never await, so they can't interleave
+        self._health: Dict[str, ModelHealth] = {}
+        # How long a half-open probe holds other requests off a recovering model
+        self._probe_timeout = float(config.rate_limit.request_timeout)
+        # Errors raised by the provider call itself, filled in once the SDK is imported;
+        # anything else is a bug and is never classified for fallback
+        self._provider_errors: Tuple[type, ...] = (asyncio.TimeoutError,)
+        self._transport_errors: Tuple[type, ...] = (asyncio.TimeoutError,)
+        
+        # Last provider traffic; keep_warm() pings only once pooled connections near expiry
+        self._last_used = 0.0
+        self._keep_warm_after = max(config.connection_pool.keepalive_expiry - 60.0, 30.0)
+        
+        # Prebuilt leading system message per personality prompt
+        self._system_messages: Dict[str, Dict[str, str]] = {}
+        
+        # Provider -> call handler, bound once so the hot path is a dict lookup
+        self._dispatch = {
+            ProviderType.GROQ: self._call_groq,
+        }
         
         # Get Groq API key and config from config.providers
         groq_key = None
@@ -44,20 +104,86 @@ class ProviderRouter:
             return
         
         try:
-            from groq import AsyncGroq
-            self.groq_client = AsyncGroq(api_key=groq_key)
+            import httpx
+            from groq import APIConnectionError, APIError, AsyncGroq
+            self._provider_errors = (APIError, httpx.HTTPError, asyncio.TimeoutError)
+            self._transport_errors = (APIConnectionError, httpx.TransportError, asyncio.TimeoutError)
+            # One pooled client for all requests so concurrent chats reuse
+            # warm keep-alive connections instead of paying for new TLS handshakes
+            pool = config.connection_pool
+            http2 = pool.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401 - httpx needs it for HTTP/2
+                except ImportError:
+                    logger.warning("http2 is enabled but h2 is not installed - using HTTP/1.1")
+                    http2 = False
+            http_client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=pool.max_connections,
+                    max_keepalive_connections=pool.max_keepalive_connections,
+                    keepalive_expiry=pool.keepalive_expiry
+                )
+            )
+            self.groq_client = AsyncGroq(
+                api_key=groq_key,
+                http_client=http_client,
+                timeout=config.rate_limit.request_timeout,
+                # The SDK retries 429/5xx/connection errors itself with async
+                # exponential backoff + jitter and honors Retry-After
+                max_retries=config.rate_limit.max_retries
+            )
         except ImportError:
             logger.error("Groq module not available - install with: pip install groq")
         except Exception as e:
             logger.error(f"Failed to initialize Groq client: {e}")
     
+    async def close(self) -> None:
+        """Close the provider client and its pooled connections."""
+        if self.groq_client:
+            await self.groq_client.close()
+            self.groq_client = None
+    
+    async def warmup(self, timeout: float = 2.0) -> None:
+        """
+        Open a connection to the provider ahead of the first chat message.
+        
+        Issues a cheap model-list request so DNS, TCP and TLS setup happen at
+        startup instead of on the first user-visible request. Failures are
+        ignored; the next real request simply connects normally.
+        
+        Args:
+            timeout: Maximum seconds to spend warming up
+        """
+        if not self.groq_client:
+            return
+        
+        start_time = time.monotonic()
+        self._last_used = start_time
+        try:
+            await asyncio.wait_for(self.groq_client.models.list(), timeout=timeout)
+            logger.info(f"✅ Groq connection warmed up ({time.monotonic() - start_time:.2f}s)")
+        except Exception as e:
+            logger.debug("Groq warmup skipped: %s", e)
+    
+    async def keep_warm(self) -> None:
+        """Re-warm the connection pool if no request has used it for a while.
+        
+        Meant to be called about once a minute; during normal traffic real
+        requests keep the connections alive and this is a no-op.
+        """
+        if time.monotonic() - self._last_used >= self._keep_warm_after:
+            await self.warmup()
+    
     async def route_request(
         self,
         message: str,
         context: str,
         max_tokens: int = 1000,
         temperature: float = 0.7,
-        personality = None
+        personality = None,
+        system_prompt: Optional[str] = None
     ) -> Tuple[str, ProviderType]:
         """
         Route request to appropriate provider with automatic fallback on rate limits.
@@ -68,6 +194,7 @@ class ProviderRouter:
             max_tokens: Maximum tokens in response
             temperature: Response temperature
             personality: PersonalityConfig object (optional)
+            system_prompt: Explicit system prompt, overrides the personality (optional)
             
         Returns:
             Tuple of (response_text, provider_used)
@@ -79,90 +206,402 @@ class ProviderRouter:
         if not self.groq_client:
             raise Exception("Groq provider not initialized. Ensure GROQ_API_KEY is set.")
         
-        # Build system prompt with personality
-        system_prompt = self._build_system_prompt(personality)
+        messages = self._build_messages(
+            system_prompt or self._build_system_prompt(personality), context, message
+        )
         
-        # Build conversation context
-        conversation_history = context
-        
-        # Prepare messages for API
-        messages = []
-        if conversation_history:
-            messages.append({
-                "role": "system",
-                "content": f"{system_prompt}\n\nPrevious conversation:\n{conversation_history}"
-            })
-        else:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
+        # Serve repeated low-temperature requests from the response cache
+        if self.cache.is_cacheable(temperature):
+            cache_key = self.cache.make_key(self.groq_model, messages, temperature, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Response cache hit")
+                return cached, ProviderType.GROQ
+            
+            # Share an identical request that is already in flight instead of repeating it
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                pending = asyncio.create_task(
+                    self._route_uncached(messages, max_tokens, temperature, cache_key)
+                )
+                self._inflight[cache_key] = pending
+                pending.add_done_callback(lambda task: self._finish_inflight(cache_key, task))
+            else:
+                logger.debug("Joined in-flight identical request")
+            return await asyncio.shield(pending)
         
-        messages.append({
-            "role": "user",
-            "content": message
-        })
+        return await self._route_uncached(messages, max_tokens, temperature, None)
+    
+    def _finish_inflight(self, cache_key: bytes, task: asyncio.Task) -> None:
+        """Drop a finished shared request from the in-flight map."""
+        self._inflight.pop(cache_key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled
+            task.exception()
+    
+    async def _route_uncached(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        cache_key: Optional[bytes]
+    ) -> Tuple[str, ProviderType]:
+        """Send a request through the model fallback chain and cache the result."""
+        provider_type = self.get_preferred_provider()
+        call_provider = self._dispatch[provider_type]
         
-        # Try primary model first, then fallback models on rate limit
-        models_to_try = [self.groq_model] + self.groq_fallback_models
+        # Try primary model first, then the healthiest fallback models on rate limit
+        models_to_try = self._models_to_try()
+        forced = len(models_to_try) == 1
+        last_error: Optional[Exception] = None
         
         for attempt, model in enumerate(models_to_try):
+            allowed, probing = self._admit(model)
+            if not (allowed or forced):
+                continue
+            logger.debug("Trying Groq model: %s (attempt %d/%d)", model, attempt + 1, len(models_to_try))
+            
+            start_ns = time.monotonic_ns()
             try:
-                logger.info(f"🔄 Trying Groq model: {model} (attempt {attempt + 1}/{len(models_to_try)})")
-                
-                start_time = time.time()
-                
-                # Call Groq API
-                response = await self.groq_client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    top_p=1.0,
-                )
-                
-                response_text = response.choices[0].message.content
-                response_time = time.time() - start_time
-                
-                # Redact secrets from response
-                redacted_response, detected_secrets = await self.safety_filter.validate_ai_output(response_text)
-                
-                if detected_secrets:
-                    logger.warning(f"Groq response contained secrets: {detected_secrets}")
-                
-                logger.info(f"✅ Groq {model} response ({response_time:.2f}s): {len(redacted_response)} chars")
-                
-                return redacted_response, ProviderType.GROQ
-                
-            except Exception as e:
-                error_str = str(e)
+                response_text = await call_provider(model, messages, max_tokens, temperature)
+            except self._provider_errors as e:
+                # Only provider/transport errors are classified for fallback; anything
+                # else, including failures in the post-processing below, is a bug
+                error_str = self._error_text(e)
+                self._record_failure(model, self._trips_breaker(e, error_str), probing)
                 
                 # Check if it's a 429 rate limit error
                 if "429" in error_str or "rate_limit_exceeded" in error_str or "rate limit" in error_str.lower():
-                    logger.warning(f"⚠️ Rate limit hit on {model}, trying fallback...")
-                    
-                    # If this is the last model, raise the error
-                    if attempt == len(models_to_try) - 1:
-                        logger.error(f"❌ All models exhausted due to rate limits. Last error: {e}")
-                        raise
-                    # Otherwise, continue to next model
-                    continue
+                    logger.warning("⚠️ Rate limit hit on %s, trying fallback...", model)
                 
                 # Check if it's a 400 decommissioned model error
                 elif "400" in error_str or "decommissioned" in error_str.lower() or "model_decommissioned" in error_str:
-                    logger.warning(f"⚠️ Model {model} has been decommissioned, trying fallback...")
-                    
-                    # If this is the last model, raise the error
-                    if attempt == len(models_to_try) - 1:
-                        logger.error(f"❌ All models exhausted or decommissioned. Last error: {e}")
-                        raise
-                    # Otherwise, continue to next model
-                    continue
+                    logger.warning("⚠️ Model %s has been decommissioned, trying fallback...", model)
                 
                 else:
                     # Non-recoverable error, stop trying
-                    logger.error(f"❌ Groq API error on {model}: {e}")
+                    logger.error("❌ Groq API error on %s: %s: %s", model, type(e).__name__, error_str)
+                    logger.debug("Groq API error traceback", exc_info=True)
+                    raise
+                
+                last_error = e
+                continue
+            except BaseException:
+                # Cancelled or failed with a bug: let the next request probe instead
+                if probing:
+                    self._release_probe(model)
+                raise
+            
+            elapsed_ns = time.monotonic_ns() - start_ns
+            self._record_success(model, elapsed_ns)
+            response_time = elapsed_ns / 1e9
+            
+            # Redact secrets from response
+            redacted_response, detected_secrets = await self.safety_filter.validate_ai_output(response_text)
+            
+            if detected_secrets:
+                logger.warning("Groq response contained secrets: %s", detected_secrets)
+            
+            logger.info("✅ Groq %s response (%.2fs): %d chars", model, response_time, len(redacted_response))
+            
+            if cache_key is not None:
+                self.cache.set(cache_key, redacted_response)
+            
+            return redacted_response, provider_type
+        
+        if last_error is not None:
+            logger.error("❌ All models exhausted. Last error: %s", self._error_text(last_error))
+            raise last_error
+        raise Exception("No Groq model available: every model is cooling down after failures")
+    
+    async def stream_request(
+        self,
+        message: str,
+        context: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        personality = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the provider as text deltas.
+        
+        Falls back to the next model on rate-limit/decommission errors, but
+        only before any text has been produced. The yielded text is raw
+        provider output; callers must redact it before displaying it.
+        
+        Args:
+            message: User message
+            context: Conversation context
+            max_tokens: Maximum tokens in response
+            temperature: Response temperature
+            personality: PersonalityConfig object (optional)
+            
+        Yields:
+            Response text fragments in order
+        """
+        if not self.groq_client:
+            raise Exception("Groq provider not initialized. Ensure GROQ_API_KEY is set.")
+        
+        messages = self._build_messages(
+            self._build_system_prompt(personality), context, message
+        )
+        models_to_try = self._models_to_try()
+        forced = len(models_to_try) == 1
+        last_error: Optional[Exception] = None
+        
+        for attempt, model in enumerate(models_to_try):
+            allowed, probing = self._admit(model)
+            if not (allowed or forced):
+                continue
+            started = False
+            try:
+                logger.debug("Streaming from Groq model: %s (attempt %d/%d)", model, attempt + 1, len(models_to_try))
+                self._last_used = time.monotonic()
+                start_ns = time.monotonic_ns()
+                stream = await self.groq_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    top_p=1.0,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        started = True
+                        yield delta
+                self._record_success(model, time.monotonic_ns() - start_ns)
+                return
+            except self._provider_errors as e:
+                error_str = self._error_text(e)
+                self._record_failure(model, self._trips_breaker(e, error_str), probing)
+                if started or not self._is_fallback_error(error_str):
+                    logger.error("❌ Groq streaming error on %s: %s: %s", model, type(e).__name__, error_str)
+                    logger.debug("Groq streaming error traceback", exc_info=True)
                     raise
+                logger.warning("⚠️ %s unavailable (%s), trying fallback...", model, error_str)
+                last_error = e
+            except BaseException:
+                # Cancelled, closed by the consumer or failed with a bug: let the next request probe
+                if probing:
+                    self._release_probe(model)
+                raise
+        
+        if last_error is not None:
+            logger.error("❌ All models exhausted. Last error: %s", self._error_text(last_error))
+            raise last_error
+        raise Exception("No Groq model available: every model is cooling down after failures")
+    
+    def _models_to_try(self) -> Tuple[str, ...]:
+        """Primary model first, then fallbacks ordered by recent failures and latency.
+        
+        Models whose circuit breaker is still cooling down are left out. If
+        every model is, only the one that reopens first is returned. This has
+        no side effects; the half-open probe is claimed by _admit() right
+        before a model is actually called.
+        """
+        health = self._health
+        fallbacks = self.groq_fallback_models
+        if len(fallbacks) > 1:
+            fallbacks = sorted(
+                fallbacks,
+                key=lambda model: (
+                    (health[model].consecutive_failures, health[model].avg_response_us)
+                    if model in health else (0, 0)
+                )
+            )
+        candidates = (self.groq_model, *fallbacks)
+        if not health:
+            return candidates
+        
+        now = time.monotonic()
+        models = tuple(
+            model for model in candidates
+            if model not in health or now >= health[model].open_until
+        )
+        if not models:
+            models = (min(candidates, key=lambda model: health[model].open_until),)
+        return models
+    
+    def _admit(self, model: str) -> Tuple[bool, bool]:
+        """Check a model's circuit breaker just before calling it.
+        
+        Returns:
+            Tuple of (allowed, probing). When the cooldown is over, this
+            request claims the half-open probe and other requests skip the
+            model until it finishes.
+        """
+        health = self._health.get(model)
+        if health is None or not health.open_until:
+            return True, False
+        now = time.monotonic()
+        if now < health.open_until:
+            return False, False
+        health.open_until = now + self._probe_timeout
+        return True, True
+    
+    def _release_probe(self, model: str) -> None:
+        """Hand back a half-open probe whose request was abandoned."""
+        self._health[model].open_until = time.monotonic()
+    
+    def _model_health(self, model: str) -> ModelHealth:
+        """Get or create the health record for a model."""
+        health = self._health.get(model)
+        if health is None:
+            health = self._health[model] = ModelHealth()
+        return health
+    
+    def _record_success(self, model: str, elapsed_ns: int) -> None:
+        """Record a completed request and fold its latency into the average."""
+        health = self._model_health(model)
+        health.total_requests += 1
+        health.consecutive_failures = 0
+        health.open_until = 0.0
+        elapsed_us = elapsed_ns // 1000
+        if health.avg_response_us:
+            # Exponential moving average with weight 1/8, in integer microseconds
+            health.avg_response_us += (elapsed_us - health.avg_response_us) // 8
+        else:
+            health.avg_response_us = elapsed_us
+    
+    def _record_failure(self, model: str, trip: bool, probing: bool = False) -> None:
+        """Record a failed request, opening the breaker for model-wide failures.
+        
+        Args:
+            model: Model that failed
+            trip: Whether the error affects every request to the model (rate
+                limit, decommission); other errors only open the breaker
+                after BREAKER_FAILURE_THRESHOLD in a row
+            probing: Whether this request held the half-open probe
+        """
+        health = self._model_health(model)
+        health.total_requests += 1
+        health.total_failures += 1
+        health.consecutive_failures += 1
+        health.last_failure = time.monotonic()
+        if not trip and health.consecutive_failures < self.BREAKER_FAILURE_THRESHOLD:
+            # A one-off error (e.g. a bad request) must not lock every user out;
+            # a probe that got this far shows the model itself is reachable again
+            if probing:
+                health.open_until = 0.0
+            return
+        cooldown = min(
+            self.BREAKER_BASE_COOLDOWN * 2 ** min(health.consecutive_failures - 1, 5),
+            self.BREAKER_MAX_COOLDOWN
+        )
+        health.open_until = health.last_failure + cooldown
+    
+    def get_health_stats(self) -> Dict[str, Dict]:
+        """Get per-model request statistics."""
+        now = time.monotonic()
+        return {
+            model: {
+                "total_requests": health.total_requests,
+                "total_failures": health.total_failures,
+                "consecutive_failures": health.consecutive_failures,
+                "avg_response_ms": health.avg_response_us / 1000,
+                "circuit_open": now < health.open_until,
+            }
+            for model, health in self._health.items()
+        }
+    
+    @classmethod
+    def _error_text(cls, error: Exception) -> str:
+        """Error message truncated to ERROR_TEXT_LIMIT characters."""
+        return str(error)[:cls.ERROR_TEXT_LIMIT]
+    
+    def _trips_breaker(self, error: Exception, error_str: str) -> bool:
+        """Check whether an error means the model itself is unavailable to everyone."""
+        error_lower = error_str.lower()
+        return (
+            isinstance(error, self._transport_errors)
+            or "429" in error_str
+            or "rate_limit_exceeded" in error_str
+            or "rate limit" in error_lower
+            or "decommissioned" in error_lower
+        )
+    
+    @staticmethod
+    def _is_fallback_error(error_str: str) -> bool:
+        """Check whether an error message should move the request to the next model."""
+        error_lower = error_str.lower()
+        return (
+            "429" in error_str
+            or "rate_limit_exceeded" in error_str
+            or "rate limit" in error_lower
+            or "400" in error_str
+            or "decommissioned" in error_lower
+        )
+    
+    async def summarize(self, transcript: str, max_tokens: int = 300) -> str:
+        """
+        Summarize a conversation transcript for long-term context.
+        
+        Args:
+            transcript: "User:/AI:" formatted conversation lines
+            max_tokens: Maximum tokens in the summary
+            
+        Returns:
+            Summary text
+        """
+        summary, _ = await self.route_request(
+            message=transcript,
+            context="",
+            max_tokens=max_tokens,
+            temperature=0.2,
+            system_prompt=self.SUMMARY_PROMPT
+        )
+        return summary.strip()
+    
+    async def _call_groq(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> str:
+        """Send a chat completion request to Groq and return the response text."""
+        self._last_used = time.monotonic()
+        response = await self.groq_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=1.0,
+        )
+        return response.choices[0].message.content
+    
+    def _build_messages(self, system_prompt: str, context: str, message: str) -> List[Dict[str, str]]:
+        """Build the API message list with a byte-stable prefix.
+        
+        The personality prompt is always sent as its own first message and the
+        conversation history follows as a separate message, so the leading
+        part of the request is identical across turns and providers can reuse
+        their prompt cache instead of re-processing it every time. The leading
+        message is built once per distinct prompt and reused.
+        
+        Args:
+            system_prompt: Static personality prompt
+            context: Formatted conversation history (may be empty)
+            message: Current user message
+            
+        Returns:
+            List of chat messages in OpenAI format
+        """
+        system_message = self._system_messages.get(system_prompt)
+        if system_message is None:
+            system_message = {"role": "system", "content": system_prompt}
+            self._system_messages[system_prompt] = system_message
+        
+        messages = [system_message]
+        if context:
+            messages.append({
+                "role": "system",
+                "content": f"Previous conversation:\n{context}"
+            })
+        messages.append({"role": "user", "content": message})
+        return messages
     
     def _build_system_prompt(self, personality = None) -> str:
         """Build system prompt from personality or config.
@@ -1,19 +1,52 @@
 """JSON-based persistent storage for conversation memories."""
 
-import json
 import os
 import asyncio
+import heapq
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 
+import orjson
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+# Frame header of zstd data, so compressed and plain JSON files can coexist
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZSTD_LEVEL = 3
+
+
+def _message_count(memory: Dict) -> int:
+    """Messages in a stored memory (the () default is a constant, so nothing is allocated)."""
+    return len(memory.get("messages", ()))
+
+
+def _dumps(memory: Dict) -> bytes:
+    """Serialize a single memory dict, zstd-compressed when zstandard is installed."""
+    data = orjson.dumps(memory)
+    if zstandard is not None:
+        # A compressor per call: instances must not be shared across worker threads
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def _loads(raw: bytes) -> Dict:
+    """Decode a memory file written either compressed or as plain JSON."""
+    if raw.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("file is zstd-compressed but zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(raw)
+    return orjson.loads(raw)
+
 
 class MemoryStorage:
-    """Handles persistent storage of conversation memories using JSON files."""
+    """Handles persistent storage of conversation memories using one JSON file per channel/guild."""
     
     def __init__(self, storage_dir: str = "data/chat_memory"):
         """
@@ -23,42 +56,129 @@ class MemoryStorage:
             storage_dir: Directory to store JSON memory files
         """
         self.storage_dir = Path(storage_dir)
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.channels_dir = self.storage_dir / "channels"
+        self.guilds_dir = self.storage_dir / "guilds"
+        self.channels_dir.mkdir(parents=True, exist_ok=True)
+        self.guilds_dir.mkdir(parents=True, exist_ok=True)
         
-        self.channels_file = self.storage_dir / "channels.json"
-        self.guilds_file = self.storage_dir / "guilds.json"
+        # Stored message counts per entity, kept up to date on every save/cleanup
+        self._channel_message_counts: Dict[int, int] = {}
+        self._guild_message_counts: Dict[int, int] = {}
+        self._message_total = 0
         
-        # Create files if they don't exist
-        self._ensure_files_exist()
-    
-    def _ensure_files_exist(self) -> None:
-        """Create JSON files if they don't exist."""
-        for file_path in [self.channels_file, self.guilds_file]:
-            if not file_path.exists():
-                with open(file_path, "w") as f:
-                    json.dump({}, f)
-    
-    def _load_all_channel_memories(self) -> Dict[int, Dict]:
-        """Load all channel memories from disk."""
+        # Last update per entity plus a min-heap of (last_updated, entity_id, is_guild)
+        # holding one entry per entity; entries may be stale and are re-checked on pop
+        self._channel_last_updated: Dict[int, float] = {}
+        self._guild_last_updated: Dict[int, float] = {}
+        self._expiry_heap: List[Tuple[float, int, bool]] = []
+        # Filled by initialize(), which reads every stored file off the event loop
+        self._indexed = False
+    
+    @property
+    def channel_count(self) -> int:
+        """Number of channels with stored memory."""
+        return len(self._channel_message_counts)
+    
+    @property
+    def guild_count(self) -> int:
+        """Number of guilds with stored memory."""
+        return len(self._guild_message_counts)
+    
+    @property
+    def message_count(self) -> int:
+        """Total messages stored across all channels and guilds."""
+        return self._message_total
+    
+    async def initialize(self) -> None:
+        """
+        Migrate legacy files and index stored memories in a worker thread.
+        
+        Startup reads every stored file, so this runs once from the cog's
+        async load instead of blocking the event loop in __init__. Later
+        updates to the index are incremental.
+        """
+        if self._indexed:
+            return
+        entries = await asyncio.to_thread(self._scan_index)
+        for is_guild, entity_id, count, updated_at in entries:
+            # A save made while scanning already holds the newer values
+            tracked = self._guild_message_counts if is_guild else self._channel_message_counts
+            if entity_id not in tracked:
+                self._track(is_guild, entity_id, count, updated_at)
+        self._indexed = True
+    
+    def _scan_index(self) -> List[Tuple[bool, int, int, float]]:
+        """Read (is_guild, entity ID, message count, last update) for every stored memory."""
+        # Split the combined files written by older versions into per-entity files
+        self._migrate_legacy_file(self.storage_dir / "channels.json", self.channels_dir)
+        self._migrate_legacy_file(self.storage_dir / "guilds.json", self.guilds_dir)
+        
+        entries = []
+        for is_guild, directory in ((False, self.channels_dir), (True, self.guilds_dir)):
+            for entity_id, memory in self._iter_all(directory):
+                entries.append((is_guild, entity_id, _message_count(memory), memory.get("last_updated", 0)))
+        return entries
+    
+    def _track_save(self, is_guild: bool, entity_id: int, memory: Dict) -> None:
+        """Record the message count and last update of a saved memory."""
+        self._track(is_guild, entity_id, _message_count(memory), memory.get("last_updated", 0))
+    
+    def _track(self, is_guild: bool, entity_id: int, count: int, updated_at: float) -> None:
+        """Update the message counts and expiry heap for one stored memory."""
+        if is_guild:
+            counts, last_updated = self._guild_message_counts, self._guild_last_updated
+        else:
+            counts, last_updated = self._channel_message_counts, self._channel_last_updated
+        
+        self._message_total += count - counts.get(entity_id, 0)
+        counts[entity_id] = count
+        
+        if entity_id not in last_updated:
+            heapq.heappush(self._expiry_heap, (updated_at, entity_id, is_guild))
+        last_updated[entity_id] = updated_at
+    
+    @staticmethod
+    def _migrate_legacy_file(legacy_file: Path, target_dir: Path) -> None:
+        """Move memories from a combined legacy JSON file into per-entity files."""
+        if not legacy_file.exists():
+            return
         try:
-            with open(self.channels_file, "r") as f:
-                data = json.load(f)
-                # Convert string keys back to int
-                return {int(k): v for k, v in data.items()}
+            with open(legacy_file, "rb") as f:
+                memories = orjson.loads(f.read())
+            for entity_id, memory in memories.items():
+                with open(target_dir / f"{int(entity_id)}.json", "wb") as f:
+                    f.write(_dumps(memory))
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+            logger.info(f"Migrated {len(memories)} memories from {legacy_file.name}")
         except Exception as e:
-            logger.error(f"Failed to load channel memories: {e}")
-            return {}
+            logger.error(f"Failed to migrate {legacy_file}: {e}")
     
-    def _load_all_guild_memories(self) -> Dict[int, Dict]:
-        """Load all guild memories from disk."""
+    @staticmethod
+    def _load_file(file_path: Path) -> Optional[Dict]:
+        """Load a single memory file, or None if it is missing or unreadable."""
         try:
-            with open(self.guilds_file, "r") as f:
-                data = json.load(f)
-                # Convert string keys back to int
-                return {int(k): v for k, v in data.items()}
+            with open(file_path, "rb") as f:
+                return _loads(f.read())
+        except FileNotFoundError:
+            return None
         except Exception as e:
-            logger.error(f"Failed to load guild memories: {e}")
-            return {}
+            logger.error(f"Failed to load memory file {file_path.name}: {e}")
+            return None
+    
+    def _iter_all(self, directory: Path) -> Iterator[Tuple[int, Dict]]:
+        """Yield (entity ID, memory) for each file in a directory, one file in memory at a time."""
+        for file_path in directory.glob("*.json"):
+            memory = self._load_file(file_path)
+            if memory is not None:
+                yield int(file_path.stem), memory
+    
+    @staticmethod
+    def _write_file(file_path: Path, memory: Dict) -> None:
+        """Write a single memory file atomically (temp file + os.replace)."""
+        temp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(_dumps(memory))
+        os.replace(temp_path, file_path)
     
     async def load_channel_memory(self, channel_id: int) -> Optional[Dict]:
         """
@@ -70,8 +190,8 @@ class MemoryStorage:
         Returns:
             Channel memory dict or None if not found
         """
-        memories = self._load_all_channel_memories()
-        return memories.get(channel_id)
+        # Read and decode in a worker thread so a large file can't stall the gateway
+        return await asyncio.to_thread(self._load_file, self.channels_dir / f"{channel_id}.json")
     
     async def load_guild_memory(self, guild_id: int) -> Optional[Dict]:
         """
@@ -83,16 +203,18 @@ class MemoryStorage:
         Returns:
             Guild memory dict or None if not found
         """
-        memories = self._load_all_guild_memories()
-        return memories.get(guild_id)
+        return await asyncio.to_thread(self._load_file, self.guilds_dir / f"{guild_id}.json")
     
-    async def save_channel_memory(self, channel_id: int, memory: Dict) -> None:
+    async def save_channel_memory(self, channel_id: int, memory: Dict) -> bool:
         """
         Save channel memory to disk asynchronously.
         
         Args:
             channel_id: Discord channel ID
             memory: Memory dict to save
+            
+        Returns:
+            True if the memory was written
         """
         try:
             # Run file I/O in thread pool to avoid blocking
@@ -104,27 +226,24 @@ class MemoryStorage:
             )
         except Exception as e:
             logger.error(f"Failed to save channel memory {channel_id}: {e}")
+            return False
+        self._track_save(False, channel_id, memory)
+        return True
     
     def _sync_save_channel_memory(self, channel_id: int, memory: Dict) -> None:
         """Synchronous version of save for use in executor."""
-        try:
-            memories = self._load_all_channel_memories()
-            memories[channel_id] = memory
-            
-            with open(self.channels_file, "w") as f:
-                # Convert int keys to strings for JSON
-                json_data = {str(k): v for k, v in memories.items()}
-                json.dump(json_data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Sync save failed for channel {channel_id}: {e}")
+        self._write_file(self.channels_dir / f"{channel_id}.json", memory)
     
-    async def save_guild_memory(self, guild_id: int, memory: Dict) -> None:
+    async def save_guild_memory(self, guild_id: int, memory: Dict) -> bool:
         """
         Save guild memory to disk asynchronously.
         
         Args:
             guild_id: Discord guild ID
             memory: Memory dict to save
+            
+        Returns:
+            True if the memory was written
         """
         try:
             # Run file I/O in thread pool to avoid blocking
@@ -136,19 +255,75 @@ class MemoryStorage:
             )
         except Exception as e:
             logger.error(f"Failed to save guild memory {guild_id}: {e}")
+            return False
+        self._track_save(True, guild_id, memory)
+        return True
     
     def _sync_save_guild_memory(self, guild_id: int, memory: Dict) -> None:
         """Synchronous version of save for use in executor."""
-        try:
-            memories = self._load_all_guild_memories()
-            memories[guild_id] = memory
+        self._write_file(self.guilds_dir / f"{guild_id}.json", memory)
+    
+    async def save_memories(
+        self,
+        channel_memories: Dict[int, Dict],
+        guild_memories: Dict[int, Dict]
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Save a batch of channel and guild memories in a single worker-thread hop.
+        
+        Args:
+            channel_memories: Memory dicts keyed by channel ID
+            guild_memories: Memory dicts keyed by guild ID
             
-            with open(self.guilds_file, "w") as f:
-                # Convert int keys to strings for JSON
-                json_data = {str(k): v for k, v in memories.items()}
-                json.dump(json_data, f, indent=2)
+        Returns:
+            Tuple of (channel IDs, guild IDs) whose memories could not be written
+        """
+        if not channel_memories and not guild_memories:
+            return [], []
+        try:
+            failed_channels, failed_guilds = await asyncio.to_thread(
+                self._sync_save_memories, channel_memories, guild_memories
+            )
         except Exception as e:
-            logger.error(f"Sync save failed for guild {guild_id}: {e}")
+            logger.error(f"Failed to save memory batch: {e}")
+            return list(channel_memories), list(guild_memories)
+        
+        # Only successful writes count towards the index and expiry heap
+        for channel_id, memory in channel_memories.items():
+            if channel_id not in failed_channels:
+                self._track_save(False, channel_id, memory)
+        for guild_id, memory in guild_memories.items():
+            if guild_id not in failed_guilds:
+                self._track_save(True, guild_id, memory)
+        return failed_channels, failed_guilds
+    
+    def _sync_save_memories(
+        self,
+        channel_memories: Dict[int, Dict],
+        guild_memories: Dict[int, Dict]
+    ) -> Tuple[List[int], List[int]]:
+        """Synchronous batch save for use in a worker thread; returns the IDs that failed."""
+        failed_channels: List[int] = []
+        failed_guilds: List[int] = []
+        for channel_id, memory in channel_memories.items():
+            try:
+                self._sync_save_channel_memory(channel_id, memory)
+            except Exception as e:
+                logger.error(f"Sync save failed for channel {channel_id}: {e}")
+                failed_channels.append(channel_id)
+        for guild_id, memory in guild_memories.items():
+            try:
+                self._sync_save_guild_memory(guild_id, memory)
+            except Exception as e:
+                logger.error(f"Sync save failed for guild {guild_id}: {e}")
+                failed_guilds.append(guild_id)
+        return failed_channels, failed_guilds
+    
+    @staticmethod
+    def _unlink_files(file_paths: List[Path]) -> None:
+        """Delete memory files (run in a worker thread)."""
+        for file_path in file_paths:
+            file_path.unlink(missing_ok=True)
     
     async def cleanup_old_memories(self, days: int = 30) -> int:
         """
@@ -161,32 +336,36 @@ class MemoryStorage:
             Number of memories removed
         """
         try:
-            cutoff_timestamp = (datetime.now() - timedelta(days=days)).timestamp()
+            cutoff_timestamp = time.time() - days * 86400
             removed_count = 0
             
-            # Cleanup channel memories
-            channel_memories = self._load_all_channel_memories()
-            for channel_id, memory in list(channel_memories.items()):
-                if memory.get("last_updated", 0) < cutoff_timestamp:
-                    del channel_memories[channel_id]
-                    removed_count += 1
-            
-            # Save cleaned up channel memories
-            with open(self.channels_file, "w") as f:
-                json_data = {str(k): v for k, v in channel_memories.items()}
-                json.dump(json_data, f, indent=2)
-            
-            # Cleanup guild memories
-            guild_memories = self._load_all_guild_memories()
-            for guild_id, memory in list(guild_memories.items()):
-                if memory.get("last_updated", 0) < cutoff_timestamp:
-                    del guild_memories[guild_id]
-                    removed_count += 1
+            # Pop only entries older than the cutoff; nothing newer is looked at
+            expired_files = []
+            heap = self._expiry_heap
+            while heap and heap[0][0] < cutoff_timestamp:
+                _, entity_id, is_guild = heapq.heappop(heap)
+                if is_guild:
+                    directory, counts = self.guilds_dir, self._guild_message_counts
+                    last_updated = self._guild_last_updated
+                else:
+                    directory, counts = self.channels_dir, self._channel_message_counts
+                    last_updated = self._channel_last_updated
+                
+                current = last_updated.get(entity_id)
+                if current is None:
+                    continue
+                if current >= cutoff_timestamp:
+                    # Saved since this entry was pushed; requeue at its real time
+                    heapq.heappush(heap, (current, entity_id, is_guild))
+                    continue
+                
+                expired_files.append(directory / f"{entity_id}.json")
+                del last_updated[entity_id]
+                self._message_total -= counts.pop(entity_id, 0)
+                removed_count += 1
             
-            # Save cleaned up guild memories
-            with open(self.guilds_file, "w") as f:
-                json_data = {str(k): v for k, v in guild_memories.items()}
-                json.dump(json_data, f, indent=2)
+            if expired_files:
+                await asyncio.to_thread(self._unlink_files, expired_files)
             
             if removed_count > 0:
                 logger.info(f"Cleaned up {removed_count} old memory records")
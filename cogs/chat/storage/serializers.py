@@ -1,6 +1,6 @@
 """Serialization utilities for memory objects."""
 
-from typing import Dict, Any
+from typing import Dict
 from datetime import datetime
 
 
@@ -14,6 +14,10 @@ class ErrorHandler(commands.Cog):
         # Ignore if command has local error handler
         if hasattr(ctx.command, 'on_error'):
             return
+
+        # Ignore if the command's cog handles its own errors
+        if ctx.cog is not None and ctx.cog.has_error_handler():
+            return
         
         # Get original error
         error = getattr(error, 'original', error)